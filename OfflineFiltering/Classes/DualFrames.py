@@ -3,6 +3,46 @@ import numpy as np
 
 from OfflineFiltering.Classes.Frame import Frame
 
+# Below this many descriptors a KD-tree index is not worth building; use brute force
+FLANN_MIN_FEATURES = 64
+
+
+def triangulate_points(P1, P2, pts1, pts2, solver="eigh"):
+    """
+    Batched linear (DLT) triangulation, drop-in for cv2.triangulatePoints.
+    pts1/pts2: (2,N) or (N,1,2) pixel coordinates.
+    solver: "eigh"     - smallest eigenvector of A^T A for every (4,4) DLT system at once
+            "cofactor" - closed-form null vector of the first 3 DLT rows (faster, ignores the 4th row)
+    Returns: (4,N) homogeneous points.
+    """
+    P1 = np.asarray(P1, dtype=np.float64)
+    P2 = np.asarray(P2, dtype=np.float64)
+    pts1 = np.asarray(pts1, dtype=np.float64)
+    pts2 = np.asarray(pts2, dtype=np.float64)
+    pts1 = pts1.T if pts1.ndim == 2 and pts1.shape[0] == 2 else pts1.reshape(-1, 2)
+    pts2 = pts2.T if pts2.ndim == 2 and pts2.shape[0] == 2 else pts2.reshape(-1, 2)
+
+    # A_i = [x P1_3 - P1_1; y P1_3 - P1_2; x' P2_3 - P2_1; y' P2_3 - P2_2]  -> (N,4,4)
+    A = np.stack([
+        pts1[:, 0:1] * P1[2] - P1[0],
+        pts1[:, 1:2] * P1[2] - P1[1],
+        pts2[:, 0:1] * P2[2] - P2[0],
+        pts2[:, 1:2] * P2[2] - P2[1],
+    ], axis=1)
+
+    if solver == "cofactor":
+        # Null vector of a 3x4 matrix: signed 3x3 minors (4-D cross product of its rows)
+        A3 = A[:, :3, :]
+        X = np.stack([(-1) ** j * np.linalg.det(np.delete(A3, j, axis=2)) for j in range(4)], axis=1)
+    elif solver == "eigh":
+        M = np.einsum("nki,nkj->nij", A, A)
+        _, V = np.linalg.eigh(M)
+        X = V[:, :, 0]
+    else:
+        raise ValueError(f"unknown solver: {solver}")
+
+    return X.T
+
 
 class DualFrames:
     def __init__(
@@ -23,6 +63,7 @@ class DualFrames:
         self.P_10 = P_10
         self.sift = sift
         self.bf = bf
+        self.flann = cv2.FlannBasedMatcher(dict(algorithm=1, trees=5), dict(checks=50))  # KDTree
         self.down_sample = down_sample
 
         self.K *= 1 / down_sample
@@ -39,34 +80,31 @@ class DualFrames:
         self.right_frame = Frame(right_frame, self.sift, self.down_sample)
 
     def solve_stereo(self, t=0.75):
-        matches = self.bf.knnMatch(self.left_frame.descriptor, self.right_frame.descriptor, k=2)
-        left_valid_matches = []
-        right_valid_matches = []
-        left_valid_features = []
-        right_valid_features = []
-        left_valid_descriptors = []
-        right_valid_descriptors = []
-        for m, n in matches:
-            if m.distance < t * n.distance:
-                left_valid_matches.append(self.left_frame.features[m.queryIdx].pt)
-                right_valid_matches.append(self.right_frame.features[m.trainIdx].pt)
-
-                left_valid_features.append(self.left_frame.features[m.queryIdx])
-                right_valid_features.append(self.right_frame.features[m.trainIdx])
-
-                left_valid_descriptors.append(self.left_frame.descriptor[m.queryIdx])
-                right_valid_descriptors.append(self.right_frame.descriptor[m.trainIdx])
-
-        left_valid_matches = np.array(left_valid_matches, dtype=np.float32).T
-        right_valid_matches = np.array(right_valid_matches, dtype=np.float32).T
-
-        left_valid_features = np.array(left_valid_features)
-        right_valid_features = np.array(right_valid_features)
-
-        left_valid_descriptors = np.array(left_valid_descriptors)
-        right_valid_descriptors = np.array(right_valid_descriptors)
-
-        world_coordinates = cv2.triangulatePoints(self.P_00, self.P_10, left_valid_matches, right_valid_matches)
+        n_features = min(len(self.left_frame.descriptor), len(self.right_frame.descriptor))
+        matcher = self.flann if n_features >= FLANN_MIN_FEATURES else self.bf
+        matches = matcher.knnMatch(self.left_frame.descriptor, self.right_frame.descriptor, k=2)
+        if len(matches) > 0:
+            dists = np.array([[m.distance, n.distance] for m, n in matches], dtype=np.float32)
+            query_idx = np.fromiter((m.queryIdx for m, _ in matches), np.int32, count=len(matches))
+            train_idx = np.fromiter((m.trainIdx for m, _ in matches), np.int32, count=len(matches))
+            good = dists[:, 0] < t * dists[:, 1]
+            query_idx = query_idx[good]
+            train_idx = train_idx[good]
+        else:
+            query_idx = train_idx = np.empty(0, dtype=np.int32)
+
+        left_points = np.asarray(cv2.KeyPoint_convert(self.left_frame.features), dtype=np.float32).reshape(-1, 2)
+        right_points = np.asarray(cv2.KeyPoint_convert(self.right_frame.features), dtype=np.float32).reshape(-1, 2)
+        left_valid_matches = left_points[query_idx].T
+        right_valid_matches = right_points[train_idx].T
+
+        left_valid_features = np.array(self.left_frame.features, dtype=object)[query_idx]
+        right_valid_features = np.array(self.right_frame.features, dtype=object)[train_idx]
+
+        left_valid_descriptors = self.left_frame.descriptor[query_idx]
+        right_valid_descriptors = self.right_frame.descriptor[train_idx]
+
+        world_coordinates = triangulate_points(self.P_00, self.P_10, left_valid_matches, right_valid_matches)
         world_coordinates = world_coordinates / world_coordinates[-1, :]
         world_coordinates = world_coordinates.T
         norm = np.linalg.norm(world_coordinates, axis=-1)
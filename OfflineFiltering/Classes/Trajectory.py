@@ -11,24 +11,45 @@ class Trajectory:
 
         self.R = np.eye(3, dtype=np.float32)
         self.t = np.zeros((3, 1), dtype=np.float32)
-        self.trajectory = np.array([0, 0, 0]).reshape(1, 3)
-        self.velocity = np.array([]).reshape(0, 3)
+
+        # Preallocated history, grown by doubling; n_* are the filled row counts
+        capacity = len(time) + 1 if hasattr(time, "__len__") else 1024
+        self._trajectory = np.zeros((capacity, 3))
+        self._velocity = np.empty((capacity, 3))
+        self.n_trajectory = 1
+        self.n_velocity = 0
 
         self.KF = KalmanFilter()
 
+    @property
+    def trajectory(self) -> np.ndarray:
+        return self._trajectory[:self.n_trajectory]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity[:self.n_velocity]
+
+    def _reserve(self, rows: int):
+        if rows > self._trajectory.shape[0]:
+            capacity = max(rows, 2 * self._trajectory.shape[0])
+            self._trajectory = np.resize(self._trajectory, (capacity, 3))
+            self._velocity = np.resize(self._velocity, (capacity, 3))
+
     def update(self, R: np.ndarray, t: np.ndarray, dt: float, s=1, valid=True):
         self.t = self.t + s * self.R @ t
         self.R = self.R @ R
 
         filtered_trajectory = self.KF.process(dt, self.t, valid)
-        self.trajectory = np.concatenate((self.trajectory, filtered_trajectory.T))
-
-        velocity = 3.6 * (self.trajectory[-1, :] - self.trajectory[-2, :]) / dt
-        velocity = velocity.reshape(1, 3)
-        self.velocity = np.concatenate((self.velocity, velocity))
-        start_index = max(0, self.velocity.shape[0] - self.filter_window_size)
-        filtered_velocity = np.mean(self.velocity[start_index:, :], axis=0)
-        self.velocity[-1, :] = filtered_velocity
+        self._reserve(self.n_trajectory + 1)
+        n = self.n_trajectory
+        self._trajectory[n] = filtered_trajectory.ravel()
+        self.n_trajectory += 1
+
+        m = self.n_velocity
+        self._velocity[m] = 3.6 * (self._trajectory[n] - self._trajectory[n - 1]) / dt
+        self.n_velocity += 1
+        start_index = max(0, self.n_velocity - self.filter_window_size)
+        self._velocity[m] = self._velocity[start_index:self.n_velocity].mean(axis=0)
 
 
     def plot_trajectory(self, axis : str="xz"):
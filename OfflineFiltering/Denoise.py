@@ -1,108 +1,124 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 import cv2
 import matplotlib.pyplot as plt
 import numpy as np
 
+try:
+    from numba import njit, prange
+except Exception:
+    njit = None
+
+try:
+    from scipy.linalg.blas import sdot
+except Exception:
+    sdot = None
+
 from VideoIterator import VideoIterator
 
 
+class WarpPlan(NamedTuple):
+    """
+    Per-homography warp data, built once and reused by every W / W^T application.
+    mapX, mapY: float32 remap maps; mask: bool in-bounds mask (H,W).
+    src, lin, w: for each of the 4 bilinear neighbors, the valid output pixels (int32),
+                 their source pixels in the reference grid (int32) and weights (float32).
+    """
+    mapX: np.ndarray
+    mapY: np.ndarray
+    mask: np.ndarray
+    src: tuple
+    lin: tuple
+    w: tuple
+
+
 # -------------------------
 # 1) Warp maps (output -> reference)
 # -------------------------
+@lru_cache(maxsize=4)
+def _pixel_grid(H_img, W_img):
+    """(H*W,1,2) float32 output pixel coords (u,v), shared by all plans of one frame size."""
+    grid = np.mgrid[0:H_img, 0:W_img][::-1].astype(np.float32)
+    grid = np.ascontiguousarray(grid.reshape(2, -1).T).reshape(-1, 1, 2)
+    grid.setflags(write=False)
+    return grid
+
+
 def build_warp_maps(H, H_img, W_img):
     """
     Given homography H mapping output pixel (u,v,1)^T -> reference (x',y'),
-    build dense float maps X,Y of reference coords for each output pixel.
-    Returns X,Y as float32 and a boolean mask of in-bounds source coords.
+    build dense float maps X,Y of reference coords for each output pixel,
+    plus the bilinear scatter indices/weights used by the adjoint.
+    Returns a WarpPlan.
     """
-    # grid of output pixels (u,v)
-    u, v = np.meshgrid(np.arange(W_img), np.arange(H_img))  # (H,W)
-    ones = np.ones_like(u, dtype=np.float64)
-
-    U = np.stack([u, v, ones], axis=0).reshape(3, -1)  # 3 x (H*W)
-    HW = H @ U                                         # 3 x (H*W)
-
-    X = (HW[0] / HW[2]).reshape(H_img, W_img)
-    Y = (HW[1] / HW[2]).reshape(H_img, W_img)
+    # project the output pixel grid in one float32 pass
+    XY = cv2.perspectiveTransform(_pixel_grid(H_img, W_img), np.asarray(H, dtype=np.float64))
+    mapX = np.ascontiguousarray(XY[:, 0, 0].reshape(H_img, W_img))
+    mapY = np.ascontiguousarray(XY[:, 0, 1].reshape(H_img, W_img))
 
     # source (reference) bounds
-    mask = (X >= 0) & (X <= (W_img - 1)) & (Y >= 0) & (Y <= (H_img - 1))
-
-    return X.astype(np.float32), Y.astype(np.float32), mask
+    mask = (mapX >= 0) & (mapX <= (W_img - 1)) & (mapY >= 0) & (mapY <= (H_img - 1))
+
+    # integer floors and fractional parts of the source coords
+    x0 = np.floor(mapX)
+    y0 = np.floor(mapY)
+    ax = (mapX - x0).ravel()
+    ay = (mapY - y0).ravel()
+    x0 = x0.astype(np.int32).ravel()
+    y0 = y0.astype(np.int32).ravel()
+    flat_mask = mask.ravel()
+
+    src, lin, w = [], [], []
+    for dx, dy, wn in [(0, 0, (1 - ax) * (1 - ay)), (1, 0, ax * (1 - ay)),
+                       (0, 1, (1 - ax) * ay), (1, 1, ax * ay)]:
+        xn = x0 + dx
+        yn = y0 + dy
+        idx = np.flatnonzero(flat_mask & (xn >= 0) & (xn < W_img) & (yn >= 0) & (yn < H_img))
+        src.append(idx.astype(np.int32))
+        lin.append(yn[idx] * W_img + xn[idx])
+        w.append(wn[idx].astype(np.float32))
+
+    return WarpPlan(mapX, mapY, mask, tuple(src), tuple(lin), tuple(w))
 
 # -------------------------
 # 2) Apply W (backward warping via remap)
 # -------------------------
-def warp_apply(x, mapX, mapY, mask=None):
+def warp_apply(x, plan):
     """
     y = W x  using cv2.remap (bilinear). Outside-mask samples -> 0.
-    x: (H,W) float32
-    mapX, mapY: float32 maps from build_warp_maps
+    x: (H,W) or (H,W,C) float32
+    plan: WarpPlan from build_warp_maps
     """
-    y = cv2.remap(x, mapX, mapY, interpolation=cv2.INTER_LINEAR,
+    y = cv2.remap(x, plan.mapX, plan.mapY, interpolation=cv2.INTER_LINEAR,
                   borderMode=cv2.BORDER_CONSTANT, borderValue=0)
-    if mask is not None:
-        y = y * mask.astype(np.float32)
-    return y
+    mask = plan.mask if y.ndim == 2 else plan.mask[..., None]
+    return y * mask
 
 # -------------------------
 # 3) Apply W^T (adjoint = splatting)
 # -------------------------
-def warp_apply_adjoint(y, mapX, mapY, H_img, W_img, mask=None):
+def warp_apply_adjoint(y, plan):
     """
     z = W^T y  (bilinear splat back to reference grid).
-    Uses np.add.at to accumulate contributions.
-    y: (H,W) sampled on the output grid (same size as reference for simplicity)
+    Uses np.bincount on the plan's linear indices to accumulate contributions.
+    y: (H,W) or (H,W,C) sampled on the output grid (same size as reference for simplicity)
     """
-    if mask is not None:
-        y = y * mask.astype(np.float32)
-
-    # source coords (X,Y) in reference image (float)
-    X = mapX.astype(np.float64)
-    Y = mapY.astype(np.float64)
-
-    # integer floors and fractional parts
-    x0 = np.floor(X).astype(np.int64)
-    y0 = np.floor(Y).astype(np.int64)
-    ax = X - x0
-    ay = Y - y0
-
-    x1 = x0 + 1
-    y1 = y0 + 1
-
-    # neighbor weights
-    w00 = (1 - ax) * (1 - ay)
-    w10 = (ax)     * (1 - ay)
-    w01 = (1 - ax) * (ay)
-    w11 = (ax)     * (ay)
-
-    # validity of each neighbor inside source bounds
-    def inside(ix, iy):
-        return (ix >= 0) & (ix < W_img) & (iy >= 0) & (iy < H_img)
-
-    H, W = H_img, W_img
-    z = np.zeros((H, W), dtype=np.float64)
-
-    # flatten indices for np.add.at
-    yy = np.arange(H)[:, None].repeat(W, axis=1)
-    xx = np.arange(W)[None, :].repeat(H, axis=0)
-
-    # Each output pixel (yy,xx) contributes y*weight to source pixels (y*,x*)
-    for (xn, yn, wn) in [(x0, y0, w00), (x1, y0, w10), (x0, y1, w01), (x1, y1, w11)]:
-        m = inside(xn, yn)
-        if mask is not None:
-            m = m & mask
-        if not np.any(m):
-            continue
-        # target indices in reference grid
-        tgt_y = yn[m]
-        tgt_x = xn[m]
-        contrib = (y[m] * wn[m]).ravel()
-        # accumulate
-        np.add.at(z, (tgt_y, tgt_x), contrib)
-
-    return z.astype(np.float32)
+    H, W = plan.mask.shape
+    flat_y = np.asarray(y, dtype=np.float32).reshape(H * W, -1)
+
+    # Each valid output pixel contributes y*weight to its 4 source neighbors;
+    # the gathered rows are shared by all channels
+    z = np.zeros((flat_y.shape[1], H * W), dtype=np.float32)
+    for src, lin, w in zip(plan.src, plan.lin, plan.w):
+        contrib = flat_y[src] * w[:, None]
+        for c in range(contrib.shape[1]):
+            z[c] += np.bincount(lin, weights=contrib[:, c], minlength=H * W)
+
+    return z.T.reshape(np.shape(y))
 
 # -------------------------
 # 4) Laplacian and biharmonic (Δ^T Δ)
@@ -115,59 +131,126 @@ def laplacian(img):
     # Neumann-like (replicate) borders to avoid dark rims
     return cv2.filter2D(img, ddepth=cv2.CV_32F, kernel=_LAPL_KER, borderType=cv2.BORDER_REPLICATE)
 
+# Δ(Δ ·) fused into one 5x5 stencil -> a single image pass
+_BIHARM_KER = np.array([[0, 0, 1, 0, 0],
+                        [0, 2, -8, 2, 0],
+                        [1, -8, 20, -8, 1],
+                        [0, 2, -8, 2, 0],
+                        [0, 0, 1, 0, 0]], dtype=np.float32)
+
 def biharmonic(img):
-    # Δ^T Δ with symmetric Laplacian -> apply twice
-    return laplacian(laplacian(img))
+    # Δ^T Δ with symmetric Laplacian (replicate borders on the 5x5 support)
+    return cv2.filter2D(img, ddepth=cv2.CV_32F, kernel=_BIHARM_KER, borderType=cv2.BORDER_REPLICATE)
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _wtw_accumulate(x, src, lin, w, out):
+        """out += W^T W x for one WarpPlan (x, out flattened to (H*W, C))."""
+        C = x.shape[1]
+        # W x: every valid output pixel appears once per neighbor -> race-free gather
+        y = np.zeros_like(x)
+        for k in range(4):
+            s, l, wk = src[k], lin[k], w[k]
+            for e in prange(s.shape[0]):
+                for c in range(C):
+                    y[s[e], c] += wk[e] * x[l[e], c]
+        # W^T y: several output pixels may splat onto the same source pixel -> serial scatter
+        for k in range(4):
+            s, l, wk = src[k], lin[k], w[k]
+            for e in range(s.shape[0]):
+                for c in range(C):
+                    out[l[e], c] += wk[e] * y[s[e], c]
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _add_biharmonic(x, lam, out):
+        """out += lam * Δ(Δ x) via the 5x5 stencil with replicate borders (same as biharmonic()). x, out: (H,W,C)."""
+        H, W, C = x.shape
+        for i in prange(H):
+            u2, u1 = max(i - 2, 0), max(i - 1, 0)
+            d1, d2 = min(i + 1, H - 1), min(i + 2, H - 1)
+            for j in range(W):
+                l2, l1 = max(j - 2, 0), max(j - 1, 0)
+                r1, r2 = min(j + 1, W - 1), min(j + 2, W - 1)
+                for c in range(C):
+                    v = (20 * x[i, j, c]
+                         - 8 * (x[u1, j, c] + x[d1, j, c] + x[i, l1, c] + x[i, r1, c])
+                         + 2 * (x[u1, l1, c] + x[u1, r1, c] + x[d1, l1, c] + x[d1, r1, c])
+                         + x[u2, j, c] + x[d2, j, c] + x[i, l2, c] + x[i, r2, c])
+                    out[i, j, c] += lam * v
 
 # -------------------------
 # 5) A x  and  b
 # -------------------------
-def A_apply(x, maps, lam):
+def A_apply(x, plans, lam):
     """
     A x = sum_i W_i^T W_i x + lam * Δ^TΔ x
-    maps: list of (mapX_i, mapY_i, mask_i)
+    plans: list of WarpPlan
+    Runs the fused numba kernels when numba is installed, NumPy/OpenCV otherwise.
     """
+    if njit is not None:
+        H, W = x.shape[:2]
+        x3 = np.ascontiguousarray(x, dtype=np.float32).reshape(H, W, -1)
+        acc = np.zeros_like(x3)
+        for plan in plans:
+            _wtw_accumulate(x3.reshape(H * W, -1), plan.src, plan.lin, plan.w, acc.reshape(H * W, -1))
+        if lam != 0.0:
+            _add_biharmonic(x3, np.float32(lam), acc)
+        return acc.reshape(x.shape)
+
     acc = np.zeros_like(x, dtype=np.float32)
-    for (mapX, mapY, mask) in maps:
-        y = warp_apply(x, mapX, mapY, mask)          # W x
-        z = warp_apply_adjoint(y, mapX, mapY, *x.shape, mask)  # W^T (W x)
+    for plan in plans:
+        y = warp_apply(x, plan)              # W x
+        z = warp_apply_adjoint(y, plan)      # W^T (W x)
         acc += z
     if lam != 0.0:
         acc += lam * biharmonic(x)
     return acc
 
-def build_rhs(y_frames, maps):
+def build_rhs(y_frames, plans):
     """
     b = sum_i W_i^T y_i
-    y_frames: list of (H,W) float32 frames in output geometry (same size)
+    y_frames: list of (H,W) or (H,W,C) float32 frames in output geometry (same size)
     """
     b = np.zeros_like(y_frames[0], dtype=np.float32)
-    for yi, (mapX, mapY, mask) in zip(y_frames, maps):
-        b += warp_apply_adjoint(yi, mapX, mapY, *yi.shape, mask)
+    for yi, plan in zip(y_frames, plans):
+        b += warp_apply_adjoint(yi, plan)
     return b
 
 # -------------------------
 # 6) Conjugate Gradient (NumPy)
 # -------------------------
+def _dot(a, b):
+    # BLAS sdot on the flat float32 views skips np.vdot's dispatch/promotion
+    if sdot is not None and a.dtype == np.float32 and b.dtype == np.float32 \
+            and a.flags.c_contiguous and b.flags.c_contiguous:
+        return float(sdot(a.ravel(), b.ravel()))
+    return float(np.vdot(a, b))
+
+def _sqnorm(r):
+    # float32 data, float64 accumulation for the residual norm / convergence check
+    return float(np.sum(r * r, dtype=np.float64))
+
 def cg(Aop, b, x0=None, max_iter=80, tol=1e-4):
-    x = np.zeros_like(b, dtype=np.float32) if x0 is None else x0.astype(np.float32).copy()
+    b = np.asarray(b, dtype=np.float32)
+    x = np.zeros_like(b) if x0 is None else x0.astype(np.float32)
     r = b - Aop(x)
     p = r.copy()
-    rsold = float(np.vdot(r, r))
+    rsold = _sqnorm(r)
     if rsold == 0.0:
         return x
     for _ in range(max_iter):
         Ap = Aop(p)
-        denom = float(np.vdot(p, Ap))
+        denom = _dot(p, Ap)
         if denom == 0.0:
             break
-        alpha = rsold / denom
-        x = x + alpha * p
-        r = r - alpha * Ap
-        rsnew = float(np.vdot(r, r))
+        alpha = np.float32(rsold / denom)
+        x += alpha * p
+        r -= alpha * Ap
+        rsnew = _sqnorm(r)
         if np.sqrt(rsnew) < tol:
             break
-        p = r + (rsnew / rsold) * p
+        p *= np.float32(rsnew / rsold)
+        p += r
         rsold = rsnew
     return x
 
@@ -176,86 +259,146 @@ def cg(Aop, b, x0=None, max_iter=80, tol=1e-4):
 # -------------------------
 def denoise_reference_frame(y_frames, H_list, lam=0.02, max_iter=80, tol=1e-4, x0=None):
     """
-    y_frames: list of (H,W) float32 frames (noisy), all same shape
+    y_frames: list of (H,W) or (H,W,C) float32 frames (noisy), all same shape.
+              Channels are solved together so the warp plans are read once per operator call.
     H_list:   list of 3x3 float64 homographies mapping (u,v,1) in output -> reference coords
               (i.e., backward maps). If you estimated ref->output, use np.linalg.inv once.
     lam: regularization weight for Laplacian prior
-    x0: optional warm-start (H,W) float32
-    Returns: x_hat (H,W) float32
+    x0: optional warm-start, same shape as the frames, float32
+    Returns: x_hat float32, same shape as the frames
     """
-    H_img, W_img = y_frames[0].shape
-    # build maps once
-    maps = [build_warp_maps(H, H_img, W_img) for H in H_list]
+    H_img, W_img = y_frames[0].shape[:2]
+    # build warp plans once
+    plans = [build_warp_maps(H, H_img, W_img) for H in H_list]
 
     # right-hand side
-    b = build_rhs(y_frames, maps)
+    b = build_rhs(y_frames, plans)
 
     # operator
-    Aop = lambda x: A_apply(x, maps, lam)
+    Aop = lambda x: A_apply(x, plans, lam)
 
     # optional better warm start: motion-compensated average
     if x0 is None:
-        # denom ~ sum W^T W 1
-        ones = np.ones_like(b, dtype=np.float32)
-        denom = np.zeros_like(b, dtype=np.float32)
+        # denom ~ sum W^T W 1 (identical for every channel)
+        ones = np.ones((H_img, W_img), dtype=np.float32)
+        denom = np.zeros((H_img, W_img), dtype=np.float32)
         num = np.zeros_like(b, dtype=np.float32)
-        for yi, (mapX, mapY, mask) in zip(y_frames, maps):
-            num   += warp_apply_adjoint(yi,   mapX, mapY, H_img, W_img, mask)
-            denom += warp_apply_adjoint(ones, mapX, mapY, H_img, W_img, mask)
+        for yi, plan in zip(y_frames, plans):
+            num   += warp_apply_adjoint(yi,   plan)
+            denom += warp_apply_adjoint(ones, plan)
         denom = np.maximum(denom, 1e-6)
-        x0 = num / denom
+        x0 = num / (denom if b.ndim == 2 else denom[..., None])
 
     # x_hat = cg(Aop, b, x0=x0, max_iter=max_iter, tol=tol)
     x_hat = x0
     return x_hat
 
 
-def get_homography(frames):
-    frames = [np.asarray(np.clip(frames[i], 0, 1) * 255, dtype=np.uint8) for i in range(len(frames))]
-    sift = cv2.SIFT_create(nfeatures=4000)
-    index_params = dict(algorithm=1, trees=5)  # KDTree
-    search_params = dict(checks=50)
-    flann = cv2.FlannBasedMatcher(index_params, search_params)
+def denoise_luma(ycc_frames, H_list, lam=0.02, max_iter=80, tol=1e-4, chroma_sigma=0.05):
+    """
+    Solve only the Y plane; frame similarity/alignment is carried by luminance.
+    ycc_frames: list of (H,W,3) float32 YCrCb frames in [0,1], reference first
+    chroma_sigma: range sigma of the bilateral filter on Cr/Cb (0 -> pass-through)
+    Returns: (H,W,3) float32 YCrCb
+    """
+    y_hat = denoise_reference_frame([f[:, :, 0] for f in ycc_frames], H_list,
+                                    lam=lam, max_iter=max_iter, tol=tol)
+    ref = ycc_frames[0]
+    if chroma_sigma > 0:
+        cr = cv2.bilateralFilter(np.ascontiguousarray(ref[:, :, 1]), 5, chroma_sigma, 3)
+        cb = cv2.bilateralFilter(np.ascontiguousarray(ref[:, :, 2]), 5, chroma_sigma, 3)
+    else:
+        cr, cb = ref[:, :, 1], ref[:, :, 2]
+    return np.dstack((y_hat, cr, cb)).astype(np.float32)
 
-    H = [np.eye(3)]
-    k1, d1 = sift.detectAndCompute(frames[0], None)
-    for i in range(1, len(frames)):
-        k2, d2 = sift.detectAndCompute(frames[i], None)
 
-        knn = flann.knnMatch(d1, d2, k=2)
-        good = []
-        for m, n in knn:
-            if m.distance < 0.75 * n.distance:
-                good.append(m)
+_feature_tls = threading.local()
 
-        pts1 = np.float32([k1[m.queryIdx].pt for m in good])
-        pts2 = np.float32([k2[m.trainIdx].pt for m in good])
 
-        Hi, mask = cv2.findHomography(pts2, pts1, method=cv2.RANSAC, ransacReprojThreshold=0.99)
-        H.append(Hi)
+def _feature_tools():
+    # SIFT / FLANN objects are not shared between worker threads
+    if not hasattr(_feature_tls, "sift"):
+        index_params = dict(algorithm=1, trees=5)  # KDTree
+        search_params = dict(checks=50)
+        _feature_tls.sift = cv2.SIFT_create(nfeatures=4000)
+        _feature_tls.flann = cv2.FlannBasedMatcher(index_params, search_params)
+    return _feature_tls.sift, _feature_tls.flann
 
-    return H
 
+def _detect(frame, scale=1.0):
+    sift, _ = _feature_tools()
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return sift.detectAndCompute(frame, None)
 
-def sharp_image(image, method, ksize, std, alpha):
-    if method == "Gaussian":
-        x_hat_smooth = cv2.GaussianBlur(image, ksize=(ksize, ksize), sigmaX=std, sigmaY=std)
-    elif method == "median":
-        x_hat_smooth = cv2.medianBlur(image, ksize=ksize)
 
-    x_hat_smooth = np.asarray(x_hat_smooth, dtype=np.float32)
-    detail = image - x_hat_smooth
+def _match_homography(ref_features, features, scale=1.0):
+    _, flann = _feature_tools()
+    k1, d1 = ref_features
+    k2, d2 = features
+
+    knn = flann.knnMatch(d1, d2, k=2)
+    good = []
+    for m, n in knn:
+        if m.distance < 0.75 * n.distance:
+            good.append(m)
 
+    # keypoints were detected on the downscaled frame -> back to full resolution
+    pts1 = np.float32([k1[m.queryIdx].pt for m in good]) / scale
+    pts2 = np.float32([k2[m.trainIdx].pt for m in good]) / scale
+
+    Hi, mask = cv2.findHomography(pts2, pts1, method=cv2.RANSAC, ransacReprojThreshold=0.99)
+    return Hi
+
+
+def get_homography(frames, max_workers=None, scale=0.5):
+    """
+    Homographies mapping every frame onto frames[0].
+    Each frame is matched against its predecessor (consecutive frames overlap most) and the
+    pairwise homographies are chained. SIFT runs once per frame at `scale` of the resolution.
+    """
+    frames = [np.asarray(np.clip(frames[i], 0, 1) * 255, dtype=np.uint8) for i in range(len(frames))]
+    if max_workers is None:
+        max_workers = max(1, min(len(frames), (os.cpu_count() or 2) - 1))
+
+    # SIFT, FLANN and RANSAC release the GIL, so frames are processed concurrently
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        features = list(pool.map(_detect, frames, [scale] * len(frames)))
+        pairwise = list(pool.map(_match_homography, features[:-1], features[1:], [scale] * (len(frames) - 1)))
+
+    H = [np.eye(3)]
+    for Hi in pairwise:
+        Hc = H[-1] @ Hi
+        H.append(Hc / Hc[2, 2])
+
+    return H
+
+
+def edge_mask(image):
+    """(H,W,1) float32 0–1 mask of dilated Canny edges; compute once per reference frame."""
     gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
     blur = cv2.GaussianBlur(gray, (5, 5), 1.2)
     edges = cv2.Canny((blur * 255).astype(np.uint8), 80, 160)
     edges = edges.astype(np.float32) / 255.0  # 0–1 mask
 
     edges = cv2.dilate(edges, (5, 5), cv2.MORPH_ELLIPSE, iterations=5)
-    edges = edges[..., None]
+    return edges[..., None]
+
 
-    x_hat_sharp = np.asarray(np.clip(image + alpha * detail * edges, 0, 255), dtype=np.uint8)
-    return x_hat_sharp
+def sharp_image(image, method, ksize, std, alpha, edges=None):
+    if method == "Gaussian":
+        x_hat_smooth = cv2.GaussianBlur(image, ksize=(ksize, ksize), sigmaX=std, sigmaY=std)
+    elif method == "median":
+        x_hat_smooth = cv2.medianBlur(image, ksize=ksize)
+
+    if edges is None:
+        edges = edge_mask(image)
+
+    x_hat_smooth = np.asarray(x_hat_smooth, dtype=np.float32)
+    detail = (image - x_hat_smooth) * edges
+
+    # image + alpha * detail, saturated to uint8 in one pass
+    return cv2.addWeighted(image, 1.0, detail, alpha, 0, dtype=cv2.CV_8U)
 
 # -------------------------
 # 8) Example usage (toy)
@@ -266,62 +409,38 @@ if __name__ == "__main__":
 
     video_iterator = VideoIterator(path)
 
-    frames_R = []
-    frames_G = []
-    frames_B = []
-
-    noisy_frames_R = []
-    noisy_frames_G = []
-    noisy_frames_B = []
+    frames = []
+    noisy_frames = []
     N = 5
     std = 0
     for i in range(N):
         frame = video_iterator[i]
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        frame_R = frame[:, :, 0]
-        frame_G = frame[:, :, 1]
-        frame_B = frame[:, :, 2]
-
-        frame_R = (frame_R - np.min(frame_R)) / (np.max(frame_R) - np.min(frame_R))
-        frame_G = (frame_G - np.min(frame_G)) / (np.max(frame_G) - np.min(frame_G))
-        frame_B = (frame_B - np.min(frame_B)) / (np.max(frame_B) - np.min(frame_B))
+        # fixed scaling keeps the noise level comparable across frames (one in-place pass)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb).astype(np.float32)
+        frame *= 1.0 / 255.0
 
-        noise_R = std * np.random.randn(*frame_R.shape)
-        noise_G = std * np.random.randn(*frame_G.shape)
-        noise_B = std * np.random.randn(*frame_B.shape)
+        noisy = frame + std * np.random.randn(*frame.shape).astype(np.float32) if std > 0 else frame
 
-        noisy_R = frame_R + noise_R
-        noisy_G = frame_G + noise_G
-        noisy_B = frame_B + noise_B
+        frames.append(frame)
+        noisy_frames.append(noisy)
 
-        frames_R.append(frame_R)
-        frames_G.append(frame_G)
-        frames_B.append(frame_B)
-
-        noisy_frames_R.append(noisy_R)
-        noisy_frames_G.append(noisy_G)
-        noisy_frames_B.append(noisy_B)
-
-    H_list = get_homography(noisy_frames_R)
+    H_list = get_homography([f[:, :, 0] for f in noisy_frames])
 
     lam = 1
-    x_hat_R = denoise_reference_frame(noisy_frames_R, H_list, lam=lam, max_iter=60, tol=1e-5)
-    x_hat_G = denoise_reference_frame(noisy_frames_G, H_list, lam=lam, max_iter=60, tol=1e-5)
-    x_hat_B = denoise_reference_frame(noisy_frames_B, H_list, lam=lam, max_iter=60, tol=1e-5)
-
-    noisy_frame = np.concatenate((frames_R[0][..., np.newaxis], frames_G[0][..., np.newaxis], frames_B[0][..., np.newaxis]), axis=-1)
-    x_hat = np.concatenate((x_hat_R[..., np.newaxis], x_hat_G[..., np.newaxis], x_hat_B[..., np.newaxis]), axis=-1)
+    x_hat = denoise_luma(noisy_frames, H_list, lam=lam, max_iter=60, tol=1e-5)
 
-    x_hat = np.asarray(np.clip(x_hat * 255, 0, 255), dtype=np.uint8)
+    noisy_frame = cv2.cvtColor(frames[0], cv2.COLOR_YCrCb2RGB)
+    x_hat = cv2.cvtColor(x_hat, cv2.COLOR_YCrCb2RGB)
+    x_hat = np.clip(x_hat * 255, 0, 255).astype(np.uint8)
 
     method = "Gaussian"
     ksize = 7
     std = (ksize - 1) / 6
     alpha = 1.5
 
-    x_hat_sharp = sharp_image(x_hat, method, ksize, std, alpha)
+    edges = edge_mask(x_hat)
+    x_hat_sharp = sharp_image(x_hat, method, ksize, std, alpha, edges=edges)
 
     fig, axis = plt.subplots(1, 3)
     axis[0].imshow(noisy_frame)
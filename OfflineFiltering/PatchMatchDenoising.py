@@ -3,37 +3,54 @@ from OfflineFiltering.VideoIterator import VideoIterator
 import numpy as np
 
 
-def get_neighborhood(i, j, frame):
-    neighbors = []
-    for di in [-1, 1]:
-        for dj in [-1, 1]:
-            ni, nj = i + di, j + dj
-            if 0 <= ni < len(frame) and 0 <= nj < len(frame[ni]):
-                neighbors.append((ni, nj))
-    return neighbors
+_DISPLACEMENTS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
 
 def patch_similarity(patch_a, patch_b):
     return np.sum((patch_a - patch_b) ** 2)
 
 def patch_top_k_match(current_frame, next_frame, patch_size=7, top_k=5, max_iterations=10):
-    f = np.zeros((current_frame.shape[0], current_frame.shape[1], 2))
-    d = np.inf * np.ones((current_frame.shape[0], current_frame.shape[1], 1), dtype=np.float32)
-
-    for k in range(max_iterations):
-        for i in range(len(current_frame)):
-            for j in range(len(current_frame[i])):
-                patch_a = current_frame[max(0, i - patch_size // 2):min(len(current_frame), i + patch_size // 2 + 1),
-                                        max(0, j - patch_size // 2):min(len(current_frame[i]), j + patch_size // 2 + 1)]
-
-                for neighbor in get_neighborhood(i, j, next_frame):
-                    ni, nj = neighbor
-                    patch_b = next_frame[max(0, ni - patch_size // 2):min(len(next_frame), ni + patch_size // 2 + 1),
-                                         max(0, nj - patch_size // 2):min(len(next_frame[ni]), nj + patch_size // 2 + 1)]
-
-                    similarity = patch_similarity(patch_a, patch_b)
-                    if similarity < d[i, j]:
-                        d[i, j] = similarity
-                        f[i, j] = [ni, nj]
+    # The match is deterministic, so a single pass gives the same result as max_iterations passes.
+    current = np.asarray(current_frame)
+    nxt = np.asarray(next_frame)
+    # 8-bit frames stay 8-bit: cv2.absdiff runs packed u8 SIMD and the square widens straight to float32
+    packed = current.dtype == np.uint8 and nxt.dtype == np.uint8
+    if not packed:
+        current = current.astype(np.float32)
+        nxt = nxt.astype(np.float32)
+    H, W = current.shape[:2]
+
+    # SSD map per displacement: box-filter the squared difference against the shifted next frame
+    ssd = np.empty((len(_DISPLACEMENTS), H, W), dtype=np.float32)
+    for k, (di, dj) in enumerate(_DISPLACEMENTS):
+        shifted = np.roll(nxt, (-di, -dj), axis=(0, 1))  # next[i + di, j + dj]
+        if packed:
+            diff = cv2.absdiff(current, shifted)
+            sq = cv2.multiply(diff, diff, dtype=cv2.CV_32F)
+        else:
+            diff = current - shifted
+            sq = diff * diff
+        if sq.ndim == 3:
+            sq = sq.sum(axis=2)
+        ssd[k] = cv2.boxFilter(sq, -1, (patch_size, patch_size), normalize=False,
+                               borderType=cv2.BORDER_REPLICATE)
+
+        # neighbors outside the frame wrapped around by np.roll -> never selected
+        if di < 0:
+            ssd[k, :-di, :] = np.inf
+        else:
+            ssd[k, H - di:, :] = np.inf
+        if dj < 0:
+            ssd[k, :, :-dj] = np.inf
+        else:
+            ssd[k, :, W - dj:] = np.inf
+
+    best = np.argmin(ssd, axis=0)
+    offsets = np.array(_DISPLACEMENTS)[best]  # (H,W,2)
+
+    ii, jj = np.meshgrid(np.arange(H), np.arange(W), indexing="ij")
+    f = np.stack([ii + offsets[..., 0], jj + offsets[..., 1]], axis=-1).astype(np.float64)
+    d = np.take_along_axis(ssd, best[None], axis=0)[0][..., None]
     return f, d
 
 
@@ -6,7 +6,7 @@ import matplotlib.pyplot as plt
 from tqdm import tqdm
 
 from OfflineFiltering.utils import build_reference_trajectory
-from OfflineFiltering.Classes.DualFrames import DualFrames
+from OfflineFiltering.Classes.DualFrames import DualFrames, triangulate_points
 from OfflineFiltering.Classes.Trajectory import Trajectory
 from OfflineFiltering.Classes.KalmanFilter import KalmanFilter
 
@@ -147,7 +147,7 @@ def visual_odometry(dataset : pykitti.raw):
         right_good_new = right_next_pts[status.flatten() == 1].reshape(-1, 1, 2)
         prev_world_coordinates = prev_world_coordinates[status.flatten() == 1]
 
-        world_coordinates = cv2.triangulatePoints(current_frames.P_00, current_frames.P_10, left_good_new, right_good_new)
+        world_coordinates = triangulate_points(current_frames.P_00, current_frames.P_10, left_good_new, right_good_new)
         world_coordinates = world_coordinates / world_coordinates[-1, :]
         world_coordinates = world_coordinates.T
         norm = np.linalg.norm(world_coordinates, axis=-1)
@@ -4,6 +4,7 @@ from .config import AppConfig
 from .core.state import AppState
 from .core.logger import _log
 from .core.hardware import _set_led
+from .core.json_provider import ORJSONProvider
 
 # Blueprints
 from .blueprints.web_bp import bp as web_bp
@@ -19,7 +20,10 @@ from .blueprints.refresh_bp import bp as refresh_bp
 from .blueprints.network_bp import bp as network_bp
 
 def create_app() -> Flask:
-    app = Flask(__name__, static_folder="../static", template_folder="templates")
+    # No built-in /static route: web_bp serves assets with gzip and content-hash caching
+    app = Flask(__name__, static_folder=None, template_folder="templates")
+    app.static_folder = "../static"
+    app.json = ORJSONProvider(app)
 
     # Load config (env overrides allowed)
     app.config.from_object(AppConfig())
@@ -1,5 +1,6 @@
 from flask import Blueprint, current_app, jsonify, request, Response
 from ..core.logger import _log
+from ..core.hardware import _release_picam2
 import time, threading, os
 
 try:
@@ -15,6 +16,9 @@ except Exception as e:
 
 bp = Blueprint("capture", __name__)
 
+# Fixed body for the START-while-running case (repeat clicks); serialized once at import
+_ALREADY_RUNNING = b'{"error":"Capture already running"}'
+
 
 def _run_capture_thread(app) -> None:
     """
@@ -41,21 +45,12 @@ def _run_capture_thread(app) -> None:
         print(f"[capture] Saving video to: {save_dir}")
 
         if config["DEVELOPMENT_MODE"]:
-            # Simulate recording
-            while not state._stop_evt.is_set():
-                time.sleep(0.25)
+            # Simulate recording: block on the event (no periodic wakeups, returns as soon as /stop sets it)
+            state._stop_evt.wait()
         else:
             # Ensure no preview instance conflicts with recording
-            if state._picam2 is not None:
-                try:
-                    state._picam2.stop()
-                except Exception:
-                    pass
-                try:
-                    state._picam2.close()
-                except Exception:
-                    pass
-                state._picam2 = None
+            with state._picam_lock:
+                _release_picam2(state)
 
             # Simple bitrate map
             w, h = int(state.CURRENT_VIDEO_RES[0]), int(state.CURRENT_VIDEO_RES[1])
@@ -90,8 +85,8 @@ def _run_capture_thread(app) -> None:
                 _log(config, state, "ERROR", f"_run_capture_thread():VideoCapture.video_capture Failed: {e}")
     finally:
         # Mark as not running even on error or stop
-        with state._state_lock:
-            state._is_running = False
+        with state._capture_lock:
+            state._capture_status = (False, state._capture_status[1])
         state._stop_evt.clear()
 
 
@@ -106,17 +101,17 @@ def start_capture():
     """
     config = current_app.config
     st = current_app.extensions["state"]
-    with st._state_lock:
-        if st._is_running:
-            return jsonify({"error": "Capture already running"}), 409
+    with st._capture_lock:
+        if st._capture_status[0]:
+            return Response(_ALREADY_RUNNING, 409, mimetype="application/json")
         st._stop_evt.clear()
-        st._is_running = True
+        started_ts = int(time.time())
+        st._capture_status = (True, started_ts)
         _log(config, st, "INFO",
              f"start_capture():Capturing video - save_dir='{st.CURRENT_SAVE_DIR}' res={st.CURRENT_VIDEO_RES} fps={st.CURRENT_VIDEO_FPS}")
-        st._last_start_ts = int(time.time())
         _capture_thread = threading.Thread(target=_run_capture_thread, args=(current_app._get_current_object(),), daemon=True)
         _capture_thread.start()
-    return jsonify({"status": "started", "started_ts": st._last_start_ts, "save_dir": st.CURRENT_SAVE_DIR})
+    return jsonify({"status": "started", "started_ts": started_ts, "save_dir": st.CURRENT_SAVE_DIR})
 
 
 @bp.route("/stop", methods=["GET"])
@@ -143,8 +138,9 @@ def status():
         JSON: {"running": bool, "started_ts": int|None, "save_dir": str}
     """
     st = current_app.extensions["state"]
-    with st._state_lock:
-        return jsonify({"running": st._is_running, "started_ts": st._last_start_ts, "save_dir": st.CURRENT_SAVE_DIR})
+    # Lock-free: the tuple is only ever rebound whole, so this read can't see a half-applied start/stop
+    running, started_ts = st._capture_status
+    return jsonify({"running": running, "started_ts": started_ts, "save_dir": st.CURRENT_SAVE_DIR})
 
 
 @bp.route("/capture_image", methods=["POST"])
@@ -172,16 +168,8 @@ def capture_image_endpoint():
     # Call real image_capture()
     try:
         if image_capture is not None and not config["DEVELOPMENT_MODE"]:
-            if st._picam2 is not None:
-                try:
-                    st._picam2.stop()
-                except Exception:
-                    pass
-                try:
-                    st._picam2.close()
-                except Exception:
-                    pass
-                st._picam2 = None
+            with st._picam_lock:
+                _release_picam2(st)
             w, h = int(st.CURRENT_IMAGE_RES[0]), int(st.CURRENT_IMAGE_RES[1])
             path = image_capture(
                 output_dir=save_dir,
@@ -1,4 +1,4 @@
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from ..core.logger import _log
 from ..core.utils import _res_to_str, _parse_res_str
 from ..core.hardware import _set_led
@@ -6,17 +6,9 @@ from ..core.hardware import _set_led
 bp = Blueprint("config", __name__)
 
 
-@bp.route("/config", methods=["GET"])
-def get_config():
-    """
-    Return current configuration and defaults for client UI.
-
-    Returns:
-        JSON with development_mode, directories, resolutions, FPS, LED.
-    """
-    config = current_app.config
-    st = current_app.extensions["state"]
-    return jsonify({
+def _config_payload(config, st) -> dict:
+    """Current configuration and defaults for the client UI (GET /config body)."""
+    return {
         "development_mode": config["DEVELOPMENT_MODE"],
         "save_dir_default": config["DEFAULT_SAVE_DIR"],
         "save_dir_current": st.CURRENT_SAVE_DIR,
@@ -29,7 +21,27 @@ def get_config():
         "video_fps_current": st.CURRENT_VIDEO_FPS,
 
         "led_on": False if config["DEVELOPMENT_MODE"] else _set_led(config, st, st.LED_ON),
-    })
+    }
+
+
+@bp.route("/config", methods=["GET"])
+def get_config():
+    """
+    Return current configuration and defaults for client UI.
+
+    Returns:
+        JSON with development_mode, directories, resolutions, FPS, LED.
+    """
+    config = current_app.config
+    st = current_app.extensions["state"]
+    # Config only changes through POST /config, so serve the bytes built after the last change
+    body = st._config_json
+    if body is None:
+        with st._config_lock:
+            body = st._config_json
+            if body is None:
+                body = st._config_json = current_app.json.dumps(_config_payload(config, st)).encode("utf-8")
+    return Response(body, mimetype="application/json")
 
 
 @bp.route("/config", methods=["POST"])
@@ -55,51 +67,56 @@ def post_config():
     except Exception:
         body = {}
 
-    # Save dir
-    save_dir = body.get("save_dir")
-    if isinstance(save_dir, str) and save_dir.strip():
-        st.CURRENT_SAVE_DIR = save_dir.strip()
-
-    # Image resolution
-    img_res = body.get("image_res")
-    if isinstance(img_res, str):
-        parsed = _parse_res_str(img_res)
-        if parsed:
-            st.CURRENT_IMAGE_RES = list(parsed)
-
-    # Video resolution
-    vid_res = body.get("video_res")
-    if isinstance(vid_res, str):
-        parsed = _parse_res_str(vid_res)
-        if parsed:
-            st.CURRENT_VIDEO_RES = list(parsed)
-
-    # Video FPS
-    fps = body.get("video_fps")
-    try:
-        if fps is not None:
-            fps = int(fps)
-            if 1 <= fps <= 120:
-                st.CURRENT_VIDEO_FPS = fps
-    except Exception:
-        pass
-    
-    # LED
-    led_on = body.get("led_on")
-    try:
-        if led_on is not None:
-            led_on = bool(led_on)
-            _set_led(config, st, led_on)
-    except Exception:
-        pass
+    with st._config_lock:
+        # Save dir
+        save_dir = body.get("save_dir")
+        if isinstance(save_dir, str) and save_dir.strip():
+            st.CURRENT_SAVE_DIR = save_dir.strip()
 
-    _log(config, st, "INFO", f"post_config():Update save_dir='{st.CURRENT_SAVE_DIR}' img={_res_to_str(st.CURRENT_IMAGE_RES)} "
-                             f"vid={_res_to_str(st.CURRENT_VIDEO_RES)} fps={st.CURRENT_VIDEO_FPS} led={st.LED_ON}")
-    return jsonify({
-        "ok": True,
-        "save_dir_current": st.CURRENT_SAVE_DIR,
-        "image_res_current": _res_to_str(st.CURRENT_IMAGE_RES),
-        "video_res_current": _res_to_str(st.CURRENT_VIDEO_RES),
-        "video_fps_current": st.CURRENT_VIDEO_FPS,
-        "led_on": st.LED_ON,
-    })
\ No newline at end of file
+        # Image resolution
+        img_res = body.get("image_res")
+        if isinstance(img_res, str):
+            parsed = _parse_res_str(img_res)
+            if parsed:
+                st.CURRENT_IMAGE_RES = list(parsed)
+
+        # Video resolution
+        vid_res = body.get("video_res")
+        if isinstance(vid_res, str):
+            parsed = _parse_res_str(vid_res)
+            if parsed:
+                st.CURRENT_VIDEO_RES = list(parsed)
+
+        # Video FPS
+        fps = body.get("video_fps")
+        try:
+            if fps is not None:
+                fps = int(fps)
+                if 1 <= fps <= 120:
+                    st.CURRENT_VIDEO_FPS = fps
+        except Exception:
+            pass
+
+        # LED
+        led_on = body.get("led_on")
+        try:
+            if led_on is not None:
+                led_on = bool(led_on)
+                _set_led(config, st, led_on)
+        except Exception:
+            pass
+
+        current = {
+            "ok": True,
+            "save_dir_current": st.CURRENT_SAVE_DIR,
+            "image_res_current": _res_to_str(st.CURRENT_IMAGE_RES),
+            "video_res_current": _res_to_str(st.CURRENT_VIDEO_RES),
+            "video_fps_current": st.CURRENT_VIDEO_FPS,
+            "led_on": st.LED_ON,
+        }
+        st._config_json = None
+
+    # Log and serialize outside the lock
+    _log(config, st, "INFO", f"post_config():Update save_dir='{current['save_dir_current']}' img={current['image_res_current']} "
+                             f"vid={current['video_res_current']} fps={current['video_fps_current']} led={current['led_on']}")
+    return jsonify(current)
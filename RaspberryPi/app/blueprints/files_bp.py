@@ -1,7 +1,8 @@
-from flask import Blueprint, current_app, jsonify, request, Response
+from flask import Blueprint, current_app, jsonify, request, Response, send_file
 from ..core.logger import _log
 from ..core.utils import _safe_under_base
-from ..core.hardware import _read_disk_free_percent
+from ..core.hardware import _forget_disk_free, _read_disk_free_percent
+from urllib.parse import quote
 import os, mimetypes, shutil, uuid
 
 
@@ -37,23 +38,27 @@ def list_files():
 
         entries = []
         try:
-            names = os.listdir(target)
+            # DirEntry carries the type from the directory read itself: no stat per name for sorting
+            with os.scandir(target) as it:
+                items = list(it)
         except Exception as e:
             _log(config, state, "ERROR", f"list_files():Failed to load files: {e}")
             return jsonify({"ok": False, "error": f"Cannot list directory: {e}"}), 500
 
-        names.sort(key=lambda n: (not os.path.isdir(os.path.join(target, n)), n.lower()))
+        items.sort(key=lambda d: (not d.is_dir(), d.name.lower()))
 
-        for name in names[:2000]:  # soft cap
-            full = os.path.join(target, name)
+        rel_dir = os.path.relpath(target, base).replace("\\", "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for d in items[:2000]:  # soft cap
             try:
-                st = os.stat(full)
+                st = d.stat()  # one stat per entry, cached on the DirEntry
+                is_dir = d.is_dir()
                 entries.append({
-                    "name": name,
-                    "type": "dir" if os.path.isdir(full) else "file",
-                    "size": st.st_size if os.path.isfile(full) else None,
+                    "name": d.name,
+                    "type": "dir" if is_dir else "file",
+                    "size": None if is_dir else st.st_size,
                     "mtime": st.st_mtime,
-                    "path": os.path.relpath(full, base).replace("\\", "/")
+                    "path": prefix + d.name
                 })
             except Exception:
                 continue
@@ -80,8 +85,10 @@ def serve_media():
         download: bool (if '1'/'true' => force Content-Disposition: attachment)
 
     Returns:
-        Streaming Response with correct mimetype and range handling.
+        File response with correct mimetype; 206 for a satisfiable Range, 416 otherwise.
+        With USE_XACCEL behind a proxy: empty response with X-Accel-Redirect.
     """
+    config = current_app.config
     state = current_app.extensions["state"]
 
     rel = (request.args.get("path") or "").strip().lstrip("/\\")
@@ -94,67 +101,23 @@ def serve_media():
     if not os.path.exists(target) or not os.path.isfile(target):
         return jsonify({"ok": False, "error": "Not found"}), 404
 
-    file_size = os.path.getsize(target)
     mime, _ = mimetypes.guess_type(target)
-    if not mime:
-        mime = "application/octet-stream"
+    mime = mime or "application/octet-stream"
 
-    def add_download_headers(rv: Response) -> Response:
-        """Optionally force 'Save as' behavior."""
+    if config["USE_XACCEL"] and request.headers.get("X-Proxy"):
+        # nginx does the transfer (sendfile, Range); the worker only emits headers. Expects:
+        #   location /_protected/ { internal; alias /; }   +   proxy_set_header X-Proxy 1;
+        rv = Response(status=200, mimetype=mime)
+        rv.headers["X-Accel-Redirect"] = config["XACCEL_PREFIX"] + quote(target.replace("\\", "/"))
         if force_download:
-            rv.headers.add("Content-Disposition", f'attachment; filename="{os.path.basename(target)}"')
+            rv.headers["Content-Disposition"] = f'attachment; filename="{os.path.basename(target)}"'
         return rv
 
-    range_header = request.headers.get("Range", None)
-    if range_header:
-        # bytes=START-END
-        try:
-            units, rng = range_header.split("=")
-            if units.strip() != "bytes":
-                raise ValueError
-            start_end = rng.split("-")
-            start = int(start_end[0]) if start_end[0] else 0
-            end = int(start_end[1]) if len(start_end) > 1 and start_end[1] else file_size - 1
-            start = max(0, start)
-            end = min(end, file_size - 1)
-            if start > end:
-                start, end = 0, file_size - 1
-        except Exception:
-            start, end = 0, file_size - 1
-
-        length = end - start + 1
-
-        def generate():
-            with open(target, "rb") as f:
-                f.seek(start)
-                chunk_size = 8192
-                remaining = length
-                while remaining > 0:
-                    data = f.read(min(chunk_size, remaining))
-                    if not data:
-                        break
-                    remaining -= len(data)
-                    yield data
-
-        rv = Response(generate(), status=206, mimetype=mime, direct_passthrough=True)
-        rv.headers.add("Content-Range", f"bytes {start}-{end}/{file_size}")
-        rv.headers.add("Accept-Ranges", "bytes")
-        rv.headers.add("Content-Length", str(length))
-        return add_download_headers(rv)
-
-    # No range: full file
-    def generate_full():
-        with open(target, "rb") as f:
-            while True:
-                data = f.read(8192)
-                if not data:
-                    break
-                yield data
-
-    rv = Response(generate_full(), mimetype=mime, direct_passthrough=True)
-    rv.headers.add("Content-Length", str(file_size))
-    rv.headers.add("Accept-Ranges", "bytes")
-    return add_download_headers(rv)
+    # send_file answers Range (206/416) and If-None-Match/If-Modified-Since itself, and hands the open
+    # file to the server's wsgi.file_wrapper: gunicorn/uwsgi push it with sendfile(2) instead of a
+    # Python read/yield loop per 8 KB
+    return send_file(target, mimetype=mime,
+                     as_attachment=force_download, conditional=True)
 
 
 @bp.route("/delete", methods=["POST"])
@@ -252,7 +215,8 @@ def delete_entry():
             shutil.move(target, dest)
             action = "moved_to_trash"
 
-        free_pct = _read_disk_free_percent(config)
+        _forget_disk_free(state.CURRENT_SAVE_DIR)
+        free_pct = _read_disk_free_percent(config, state.CURRENT_SAVE_DIR)
         _log(config, state, "INFO", f"delete_entry():Action:{action} path='{rel}'")
         return jsonify({
             "ok": True,
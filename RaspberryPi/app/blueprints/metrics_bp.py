@@ -1,38 +1,171 @@
-import time
-from flask import Blueprint, current_app, jsonify
-from ..core.hardware import (_read_cpu_temp_c, _read_gpu_temp_c, _read_cpu_util_percent, _read_ram_percent_used,
-                           _read_disk_free_percent, _read_cpu_freq_mhz, _read_voltage_current)
+import time, threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Response, current_app, jsonify, request
+from ..core.hardware import _metric_readers
+from ..core.logger import _log
 
 
 bp = Blueprint("metrics", __name__)
 
+# Hardware reads (procfs/sysfs/vcgencmd/I2C) block; run them side by side instead of one after another
+_read_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="metrics")
 
-@bp.route("/metrics", methods=["GET"])
-def metrics():
-    """
-    Return a snapshot of system metrics for the UI graphs.
+# One background sampler feeds every client; procfs load no longer scales with open tabs
+METRICS_SAMPLE_SEC = 1.0
+# Comment line sent on an idle stream so proxies don't drop the connection
+SSE_KEEPALIVE_SEC = 15.0
 
-    Returns:
-        JSON with timestamps and numeric fields for CPU/GPU temp, CPU util/clock,
-        RAM used percent, disk free percent, and optional sensor (A/V).
-    """
-    config = current_app.config
-    st = current_app.extensions["state"]
+
+def _sample(config, st) -> dict:
+    """Read every metric once and return the /metrics JSON payload."""
     ts = time.time()
-    cpu_temp = _read_cpu_temp_c(config)
-    gpu_temp = _read_gpu_temp_c(config)
-    cpu_util = _read_cpu_util_percent(config, st)
-    ram_used = _read_ram_percent_used(config)
-    disk_free = _read_disk_free_percent(config)
-    cpu_mhz = _read_cpu_freq_mhz(config)
-    amps, volts, power = _read_voltage_current(config)
+    save_dir = st.CURRENT_SAVE_DIR
+    rd = _metric_readers(config)
+    if config["DEVELOPMENT_MODE"]:
+        # In-memory stubs: not worth a thread hop
+        cpu_temp = rd.cpu_temp_c()
+        gpu_temp = rd.gpu_temp_c()
+        cpu_util = rd.cpu_util_percent(st)
+        ram_used = rd.ram_percent_used()
+        disk_free = rd.disk_free_percent(save_dir)
+        cpu_mhz = rd.cpu_freq_mhz()
+        amps, volts, power = rd.voltage_current(config)
+    else:
+        futures = (
+            _read_pool.submit(rd.gpu_temp_c),
+            _read_pool.submit(rd.voltage_current, config),
+            _read_pool.submit(rd.disk_free_percent, save_dir),
+        )
+        cpu_temp = rd.cpu_temp_c()
+        cpu_util = rd.cpu_util_percent(st)
+        ram_used = rd.ram_percent_used()
+        cpu_mhz = rd.cpu_freq_mhz()
+        gpu_temp, (amps, volts, power), disk_free = (f.result() for f in futures)
 
     def rnd(x, n=2): return None if x is None else round(x, n)
-    return jsonify({
+    return {
         "ts": ts,
         "sensors": {"current_a": rnd(amps, 3), "voltage_v": rnd(volts, 3), "power_w": rnd(power, 3)},
         "cpu": {"temp_c": rnd(cpu_temp, 1), "util_pct": rnd(cpu_util, 1), "freq_mhz": rnd(cpu_mhz, 0)},
         "gpu": {"temp_c": rnd(gpu_temp, 1)},
         "ram": {"used_pct": rnd(ram_used, 1)},
-        "disk": {"free_pct": rnd(disk_free, 1), "path": st.CURRENT_SAVE_DIR}
-    })
\ No newline at end of file
+        "disk": {"free_pct": rnd(disk_free, 1), "path": save_dir}
+    }
+
+
+def _run_sampler(app) -> None:
+    """Background thread: append one sample to the shared history every METRICS_SAMPLE_SEC."""
+    config = app.config
+    st = app.extensions["state"]
+    while True:
+        try:
+            sample = _sample(config, st)
+            with st._metrics_cond:
+                st._metrics_history.append(sample)
+                st._metrics_cond.notify_all()
+        except Exception as e:
+            _log(config, st, "ERROR", f"_run_sampler():Failed to sample metrics: {e}")
+        time.sleep(METRICS_SAMPLE_SEC)
+
+
+def _ensure_sampler(app) -> None:
+    """Start the sampler on first use (not at import, so the debug reloader parent stays idle)."""
+    st = app.extensions["state"]
+    if st._sampler_thread is not None:
+        return
+    with st._metrics_lock:
+        if st._sampler_thread is None:
+            st._sampler_thread = threading.Thread(target=_run_sampler, args=(app,), daemon=True)
+            st._sampler_thread.start()
+
+
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Return the latest snapshot of system metrics for the UI graphs.
+
+    Returns:
+        JSON with timestamps and numeric fields for CPU/GPU temp, CPU util/clock,
+        RAM used percent, disk free percent, and optional sensor (A/V).
+    """
+    app = current_app._get_current_object()
+    st = app.extensions["state"]
+    _ensure_sampler(app)
+    with st._metrics_lock:
+        latest = st._metrics_history[-1] if st._metrics_history else None
+    if latest is None:
+        latest = _sample(app.config, st)
+    # Polls between two sampler ticks get the same bytes: serialize each sample once
+    cached = st._metrics_json
+    if cached is None or cached[0] != latest["ts"]:
+        cached = (latest["ts"], app.json.dumps(latest).encode("utf-8"))
+        st._metrics_json = cached
+    return Response(cached[1], mimetype="application/json")
+
+
+@bp.route("/metrics/batch", methods=["GET"])
+def metrics_batch():
+    """
+    Return every buffered sample newer than `since`.
+
+    Query params:
+        since: float epoch seconds (default 0 -> whole history, up to METRICS_HISTORY_LEN samples)
+
+    Returns:
+        JSON: {"ok": true, "samples": [<same shape as /metrics>, ...]} oldest first
+    """
+    app = current_app._get_current_object()
+    st = app.extensions["state"]
+    _ensure_sampler(app)
+    try:
+        since = float(request.args.get("since") or 0)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Invalid 'since'"}), 400
+    with st._metrics_lock:
+        samples = [s for s in st._metrics_history if s["ts"] > since]
+    return jsonify({"ok": True, "samples": samples})
+
+
+@bp.route("/metrics/stream", methods=["GET"])
+def metrics_stream():
+    """
+    Server-Sent Events feed of metric samples, pushed as the sampler produces them.
+
+    Each event is `id: <ts>` + `data: <same JSON as /metrics>`. On reconnect the browser sends
+    Last-Event-ID, so only samples the client has not seen are replayed (`since` works too).
+    Capture state rides on the same connection as `event: status` (same JSON as /status), sent on
+    connect and whenever it changes (checked once per sample).
+
+    Returns:
+        text/event-stream response that stays open until the client disconnects
+    """
+    app = current_app._get_current_object()
+    st = app.extensions["state"]
+    _ensure_sampler(app)
+    try:
+        since = float(request.headers.get("Last-Event-ID") or request.args.get("since") or 0)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Invalid 'since'"}), 400
+    dumps = app.json.dumps
+
+    def events():
+        last, last_status = since, None
+        while True:
+            running, started_ts = st._capture_status
+            status = (running, started_ts, st.CURRENT_SAVE_DIR)
+            if status != last_status:
+                last_status = status
+                yield f"event: status\ndata: {dumps({'running': running, 'started_ts': started_ts, 'save_dir': status[2]})}\n\n"
+            with st._metrics_cond:
+                st._metrics_cond.wait_for(
+                    lambda: st._metrics_history and st._metrics_history[-1]["ts"] > last,
+                    timeout=SSE_KEEPALIVE_SEC)
+                new = [s for s in st._metrics_history if s["ts"] > last]
+            if not new:
+                yield ": keepalive\n\n"
+                continue
+            last = new[-1]["ts"]
+            yield "".join(f"id: {s['ts']}\ndata: {dumps(s)}\n\n" for s in new)
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -2,11 +2,12 @@ from flask import Blueprint, current_app, jsonify, request, Response
 from ..core.hardware import _ensure_picam2
 from ..core.logger import _log
 from ..core.utils import _apply_preview_controls_if_running, _sanitize_and_merge_preview_ctrls
-import cv2
-import time
 
 bp = Blueprint("preview", __name__)
 
+# How long a stream waits for the next encoded frame before re-checking that its camera is still live
+PREVIEW_FRAME_TIMEOUT_SEC = 1.0
+
 
 @bp.route("/preview.mjpg", methods=["GET"])
 def preview_mjpg():
@@ -16,8 +17,8 @@ def preview_mjpg():
     DEV mode:
         Returns 503 since no real camera is used.
     PROD:
-        Uses a dedicated Picamera2 instance configured for BGR888 and encodes
-        each frame as JPEG (quality=80).
+        (Re)starts the preview camera with the hardware MJPEG encoder and forwards each
+        JPEG it produces; frame rate follows the camera's FrameRate control.
     """
     config = current_app.config
     st = current_app.extensions["state"]
@@ -28,33 +29,19 @@ def preview_mjpg():
         return jsonify({"ok": False, "error": "Preview disabled in DEV"}), 503
 
     try:
-        cam = _ensure_picam2(st)
+        sink = _ensure_picam2(st)
         _log(config, st, "INFO", f"preview_mjpg():Shape = [{st.CURRENT_VIDEO_RES[0]}x{st.CURRENT_VIDEO_RES[1]} | FPS = {st.CURRENT_VIDEO_FPS}]")
     except Exception as e:
         _log(config, st, "ERROR", f"preview_mjpg():Failed to preview image: {e}")
         return jsonify({"ok": False, "error": f"camera init failed: {e}"}), 503
 
     def gen():
-        delay = 1.0 / max(1, st._preview_fps)
-        while True:
-            try:
-                bgr = cam.capture_array()  # shape (H,W,3), dtype=uint8
-                ok, buf = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
-                if not ok:
-                    time.sleep(delay)
-                    continue
-                jpg = buf.tobytes()
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n"
-                    b"Content-Length: " + str(len(jpg)).encode() + b"\r\n\r\n" +
-                    jpg + b"\r\n"
-                )
-            except GeneratorExit:
-                break
-            except Exception:
-                time.sleep(delay)
-                continue
+        seq = 0
+        # Ends once the camera is released or replaced (capture started, another preview opened)
+        while st._preview_sink is sink:
+            seq, jpg = sink.next_frame(seq, PREVIEW_FRAME_TIMEOUT_SEC)
+            if jpg is not None:
+                yield b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%s\r\n" % (len(jpg), jpg)
 
     return Response(gen(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
@@ -2,11 +2,21 @@ import time
 import platform
 import subprocess
 from ..core.logger import _log
+from ..core.shell import ShellWorker
 from flask import Blueprint, current_app, jsonify, request
 
 
 bp = Blueprint("shell", __name__)
 
+# A command line is tiny; anything bigger is refused before it is read or parsed
+SHELL_MAX_BODY_BYTES = 64 * 1024
+
+# Host OS never changes at runtime; resolve it once instead of uname per request
+_IS_WINDOWS = "windows" in platform.system().lower()
+
+# Persistent bash reused across calls (POSIX only); a concurrent call gets a one-off bash instead
+_worker = ShellWorker()
+
 
 @bp.route("/shell", methods=["POST"])
 def run_shell():
@@ -25,10 +35,18 @@ def run_shell():
     if not config["SHELL_ENABLED"]:
         return jsonify({"error": "Shell disabled on server"}), 403
 
+    if (request.content_length or 0) > SHELL_MAX_BODY_BYTES:
+        return jsonify({"error": "Body too large"}), 413
+    # Bounded read also covers chunked bodies that carry no Content-Length
+    raw = request.stream.read(SHELL_MAX_BODY_BYTES + 1)
+    if len(raw) > SHELL_MAX_BODY_BYTES:
+        return jsonify({"error": "Body too large"}), 413
     try:
-        body = request.get_json(force=True, silent=True) or {}
+        body = current_app.json.loads(raw) or {}
     except Exception:
         body = {}
+    if not isinstance(body, dict):
+        body = {}
 
     cmd = (body.get("cmd") or "").strip()
     if not cmd:
@@ -40,10 +58,11 @@ def run_shell():
     except Exception:
         timeout = config["SHELL_TIMEOUT_DEFAULT"]
 
+    max_chars = config["SHELL_MAX_CHARS"]
+    truncated = False
     start = time.time()
-    os_name = platform.system().lower()
     try:
-        if "windows" in os_name:
+        if _IS_WINDOWS:
             exec_cmd = ["cmd", "/c", cmd]
             res = subprocess.run(
                 exec_cmd, capture_output=True, text=True, timeout=timeout,
@@ -51,10 +70,18 @@ def run_shell():
             )
         else:
             exec_cmd = ["bash", "-lc", cmd]
-            res = subprocess.run(
-                exec_cmd, capture_output=True, text=True, timeout=timeout,
-                encoding="utf-8", errors="replace"
-            )
+            if _worker.lock.acquire(blocking=False):
+                try:
+                    res, truncated = _worker.run(cmd, timeout, max_chars)
+                finally:
+                    _worker.lock.release()
+            else:
+                # Worker busy: a throwaway one keeps the same bounded, streaming read
+                worker = ShellWorker()
+                try:
+                    res, truncated = worker.run(cmd, timeout, max_chars)
+                finally:
+                    worker.kill()
         elapsed = time.time() - start
     except subprocess.TimeoutExpired as e:
         _log(config, st, "ERROR", f"run_shell():Timeout cmd='{cmd}'")
@@ -66,8 +93,9 @@ def run_shell():
             "ran": exec_cmd if 'exec_cmd' in locals() else cmd,
         }), 504
 
-    stdout = (res.stdout or "")[:config["SHELL_MAX_CHARS"]]
-    stderr = (res.stderr or "")[:config["SHELL_MAX_CHARS"]]
+    truncated = truncated or len(res.stdout or "") > max_chars or len(res.stderr or "") > max_chars
+    stdout = (res.stdout or "")[:max_chars]
+    stderr = (res.stderr or "")[:max_chars]
 
     _log(config, st, "INFO", f"run_shell():Run cmd='{cmd}' timeout={timeout}s")
     return jsonify({
@@ -76,5 +104,6 @@ def run_shell():
         "elapsed_sec": round(elapsed, 3),
         "stdout": stdout,
         "stderr": stderr,
+        "truncated": truncated,
         "ran": exec_cmd,
     })
\ No newline at end of file
@@ -1,14 +1,76 @@
-from flask import Blueprint, render_template, send_from_directory, current_app
+import gzip, hashlib, mimetypes
+from flask import Blueprint, render_template, send_from_directory, current_app, request, Response, abort
+from werkzeug.utils import safe_join
 
 bp = Blueprint("web", __name__)
 
+# Text assets worth compressing; images etc. go through send_from_directory untouched
+_GZIP_EXTS = (".js", ".css")
+# URLs carrying the current content hash (?v=) never change, so browsers can keep them for a year
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _index_payload():
+    """Render index.html once per app and keep (raw bytes, gzip bytes, etag)."""
+    payload = current_app.extensions.get("index_html")
+    if payload is None or current_app.debug:
+        raw = render_template("index.html").encode("utf-8")
+        payload = (raw, gzip.compress(raw, 9), hashlib.md5(raw).hexdigest())
+        current_app.extensions["index_html"] = payload
+    return payload
+
+
+def _asset_payload(path):
+    """Read a static text asset once per app and keep (raw bytes, gzip bytes, content hash)."""
+    assets = current_app.extensions.setdefault("static_assets", {})
+    payload = assets.get(path)
+    if payload is None or current_app.debug:
+        full = safe_join(current_app.static_folder, path)
+        try:
+            with open(full, "rb") as f:
+                raw = f.read()
+        except (TypeError, OSError):
+            abort(404)
+        payload = (raw, gzip.compress(raw, 9), hashlib.md5(raw).hexdigest()[:12])
+        assets[path] = payload
+    return payload
+
+
+def _cached_response(raw, gz, etag, mimetype, cache_control):
+    """Serve raw/gzip bytes by Accept-Encoding, answering 304 when the ETag matches."""
+    use_gzip = "gzip" in (request.headers.get("Accept-Encoding") or "")
+    tag = f"{etag}-gz" if use_gzip else etag
+
+    if request.if_none_match.contains(tag):
+        rv = Response(status=304)
+    else:
+        rv = Response(gz if use_gzip else raw, mimetype=mimetype)
+        if use_gzip:
+            rv.headers["Content-Encoding"] = "gzip"
+    rv.set_etag(tag)
+    rv.headers["Vary"] = "Accept-Encoding"
+    rv.headers["Cache-Control"] = cache_control
+    return rv
+
+
+@bp.app_context_processor
+def _asset_urls():
+    """Templates link assets as asset_url('app.js') -> /static/app.js?v=<hash>, so each revision gets a new URL."""
+    return {"asset_url": lambda path: f"/static/{path}?v={_asset_payload(path)[2]}"}
+
+
 @bp.route("/", methods=["GET"])
 def index():
-    """Serve the main HTML UI."""
-    return render_template("index.html")
+    """Serve the main HTML UI (precompressed, revalidated with ETag)."""
+    raw, gz, etag = _index_payload()
+    return _cached_response(raw, gz, etag, "text/html", "no-cache")
 
 
 @bp.route("/static/<path:path>", methods=["GET"])
 def send_static(path):
-    """Serve static assets from /static."""
-    return send_from_directory(current_app.static_folder, path)
+    """Serve static assets from /static; JS/CSS precompressed and cached forever when versioned."""
+    if not path.endswith(_GZIP_EXTS):
+        return send_from_directory(current_app.static_folder, path)
+    raw, gz, digest = _asset_payload(path)
+    cache = _IMMUTABLE if request.args.get("v") == digest else "no-cache"
+    return _cached_response(raw, gz, digest, mimetypes.guess_type(path)[0], cache)
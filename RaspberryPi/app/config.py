@@ -50,6 +50,13 @@ class AppConfig:
     # Rotate every N hours (no thread; checked on each write)
     LOG_RESET_HOURS_DEFAULT = cfg["log_reset_hours_default"]
 
+    # Server-side metrics history (1 Hz samples -> 5 min)
+    METRICS_HISTORY_LEN = cfg["metrics_history_len"]
+
+    # /media offload: behind nginx, answer with X-Accel-Redirect to XACCEL_PREFIX + <absolute path>
+    USE_XACCEL = cfg["use_xaccel"]
+    XACCEL_PREFIX = cfg["xaccel_prefix"].rstrip("/")
+
     # Preview defaults
     DEFAULT_PREVIEW_CTRLS = {
         "AeEnable": True,
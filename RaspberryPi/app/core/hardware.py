@@ -1,6 +1,13 @@
+import glob
+import io
 import os
+import random
+import re
 import subprocess
-from typing import Optional, Tuple
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple, Optional, Tuple
 from flask.config import Config
 from .state import AppState
 from .utils import _filter_controls
@@ -11,33 +18,185 @@ try:
 except Exception as e:
     Picamera2 = None
 
+try:
+    from picamera2.encoders import MJPEGEncoder
+    from picamera2.outputs import FileOutput
+except Exception as e:
+    MJPEGEncoder = FileOutput = None
+
 try:
     import RPi.GPIO as GPIO
 except Exception as e:
     GPIO = None
 
 
-def _randf(lo: float, hi: float) -> float:
-    """Return a random float in [lo, hi] without importing random."""
-    r = int.from_bytes(os.urandom(8), "big") / (1 << 64)
-    return lo + (hi - lo) * r
+# procfs/sysfs values are re-read at most once per window, however many clients poll /metrics
+PROC_TTL_SEC = 1.0
+# vcgencmd forks a process; never run it more than once per window
+GPU_TEMP_TTL_SEC = 2.0
+# statvfs touches the SD card superblock; free space barely moves within a few seconds
+STATVFS_TTL_SEC = 5.0
 
 
-def _read_cpu_temp_c(config: Config) -> Optional[float]:
-    """Return CPU temperature in °C, or None if unavailable (DEV may simulate)."""
-    if config["DEVELOPMENT_MODE"]:
-        return round(_randf(38.0, 72.0), 1)
+@dataclass
+class _ProcCache:
+    """Process-wide {key: (expiry_monotonic, value)} cache for pseudo-file reads and probes."""
+    entries: dict = field(default_factory=dict)
+    locks: dict = field(default_factory=dict)  # one refresh lock per key
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_proc_cache = _ProcCache()
+
+# /proc/meminfo opens with MemTotal; MemAvailable follows a couple of lines later
+_MEM_RE = re.compile(rb"MemTotal:\s+(\d+).*?^MemAvailable:\s+(\d+)", re.M | re.S)
+# Aggregate line of /proc/stat: user nice system idle [iowait irq softirq steal] (older kernels stop early)
+_STAT_RE = re.compile(rb"cpu +(\d+) (\d+) (\d+) (\d+)(?: (\d+))?(?: (\d+))?(?: (\d+))?(?: (\d+))?")
+
+# Pseudo-files stay open; pread at offset 0 returns a fresh snapshot without open/close/path lookup
+_FDS = {}
+_fds_lock = threading.Lock()
+
+# Hot-path names resolved once at import instead of a module + attribute lookup per metric read
+_HAS_PREAD = hasattr(os, "pread")
+_os_pread = getattr(os, "pread", None)
+_monotonic = time.monotonic
+# Directory handles only feed fstatvfs: O_PATH (Linux) skips the read-permission check and any I/O
+_DIR_FLAGS = getattr(os, "O_PATH", os.O_RDONLY) | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+
+
+def _get_fd(path: str, flags: int = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0)) -> int:
+    fd = _FDS.get(path)
+    if fd is None:
+        with _fds_lock:
+            fd = _FDS.get(path)
+            if fd is None:
+                fd = os.open(path, flags)
+                _FDS[path] = fd
+    return fd
+
+
+def _pread(path: str, size: int = 4096) -> bytes:
+    """Read up to size bytes of path from offset 0 through a persistent fd."""
+    if not _HAS_PREAD:
+        with open(path, "rb") as f:
+            return f.read(size)
+    fd = _FDS.get(path)
+    if fd is None:
+        fd = _get_fd(path)
     try:
-        with open("/sys/class/thermal/thermal_zone0/temp") as f:
-            return float(f.read().strip()) / 1000.0
+        return _os_pread(fd, size, 0)
+    except OSError:
+        # stale fd (e.g. sysfs node re-created): drop it and reopen once
+        with _fds_lock:
+            if _FDS.get(path) == fd:
+                del _FDS[path]
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        return _os_pread(_get_fd(path), size, 0)
+
+
+def _cached_call(key: str, loader: Callable[[], object], ttl: float = PROC_TTL_SEC):
+    """Return loader(), memoized under key for ttl seconds. Loader errors propagate."""
+    now = _monotonic()
+    entries = _proc_cache.entries
+    hit = entries.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+    key_lock = _proc_cache.locks.get(key)
+    if key_lock is None:
+        with _proc_cache.lock:
+            key_lock = _proc_cache.locks.setdefault(key, threading.Lock())
+    with key_lock:
+        # another thread may have refreshed it while we waited
+        hit = entries.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        value = loader()
+        entries[key] = (_monotonic() + ttl, value)
+        return value
+
+
+def _cached_read(path: str, parser: Callable[[bytes], object], ttl: float = PROC_TTL_SEC, size: int = 4096):
+    """Return parser(<first size bytes of path>), memoized for ttl seconds. Read errors propagate."""
+    return _cached_call(path, lambda: parser(_pread(path, size)), ttl)
+
+
+# DEV-mode jitter only; a userspace PRNG avoids a getrandom() syscall per value
+_rng = random.Random()
+_randf = _rng.uniform  # random float in [lo, hi]
+
+
+# -------------------------
+# DEV stubs (simulated values, no I/O)
+# -------------------------
+def _cpu_temp_dev() -> float:
+    return round(_randf(38.0, 72.0), 1)
+
+
+def _gpu_temp_dev() -> float:
+    return round(_randf(40.0, 70.0), 1)
+
+
+def _cpu_util_dev(state: AppState) -> float:
+    base = _randf(8.0, 35.0)
+    spike = _randf(0, 1)
+    return round(base + (50.0 if spike > 0.95 else 0.0), 1)
+
+
+def _ram_dev() -> float:
+    return round(_randf(20.0, 85.0), 1)
+
+
+def _disk_free_dev(path: str) -> float:
+    return round(_randf(35.0, 95.0), 1)
+
+
+def _cpu_freq_dev() -> float:
+    return round(_randf(600.0, 1500.0), 0)
+
+
+def _power_dev(config: Config) -> Tuple[float, float, float]:
+    volts = round(_randf(4.80, 5.20), 3)
+    amps = round(_randf(0.10, 2.50), 3)
+    return amps, volts, volts * amps
+
+
+# -------------------------
+# Hardware readers
+# -------------------------
+def _parse_milli(data: bytes) -> float:
+    # Millidegrees as an int (int() takes bytes and ignores the trailing newline); round to tenths
+    # in integer math so the single float divide already yields the value /metrics reports
+    return ((int(data) + 50) // 100) / 10
+
+
+def _cpu_temp_hw() -> Optional[float]:
+    try:
+        return _cached_read("/sys/class/thermal/thermal_zone0/temp", _parse_milli, size=16)
     except Exception:
         return None
 
 
-def _read_gpu_temp_c(config: Config) -> Optional[float]:
-    """Return GPU temperature in °C via vcgencmd, or None if unavailable."""
-    if config["DEVELOPMENT_MODE"]:
-        return round(_randf(40.0, 70.0), 1)
+def _find_gpu_thermal_path() -> Optional[str]:
+    """Probe sysfs once for a GPU thermal zone (gpu_thermal / vc4); cached, may be None."""
+    def probe():
+        for type_path in sorted(glob.glob("/sys/class/thermal/thermal_zone*/type")):
+            try:
+                with open(type_path) as f:
+                    kind = f.read().strip().lower()
+            except Exception:
+                continue
+            if kind in ("gpu_thermal", "gpu-thermal", "vc4"):
+                return os.path.join(os.path.dirname(type_path), "temp")
+        return None
+    return _cached_call("gpu_thermal_path", probe, ttl=float("inf"))
+
+
+def _vcgencmd_temp_c() -> Optional[float]:
+    # failures are cached too, so a missing vcgencmd is not re-spawned on every poll
     try:
         out = subprocess.check_output(["vcgencmd", "measure_temp"], text=True, timeout=1)
         if "temp=" in out:
@@ -47,88 +206,184 @@ def _read_gpu_temp_c(config: Config) -> Optional[float]:
     return None
 
 
-def _read_cpu_util_percent(config: Config, state:AppState) -> Optional[float]:
-    """
-    Return CPU utilization percent based on /proc/stat deltas, or None on first call.
-    DEV mode returns simulated values.
-    """
-    if config["DEVELOPMENT_MODE"]:
-        base = _randf(8.0, 35.0)
-        spike = _randf(0, 1)
-        return round(base + (50.0 if spike > 0.95 else 0.0), 1)
+def _gpu_temp_hw() -> Optional[float]:
     try:
-        with open("/proc/stat") as f:
-            line = f.readline()
-        if not line.startswith("cpu "):
-            return None
-        parts = [float(x) for x in line.split()[1:11]]
-        user, nice, system, idle, iowait, irq, softirq, steal, *_ = (parts + [0] * 10)[:8]
-        idle_all = idle + iowait
-        non_idle = user + nice + system + irq + softirq + steal
-        total = idle_all + non_idle
-        if state._prev_total is None:
-            state._prev_total, state._prev_idle = total, idle_all
-            return None
-        totald = total - state._prev_total
-        idled = idle_all - state._prev_idle
-        _prev_total, _prev_idle = total, idle_all
-        if totald <= 0:
-            return None
-        return max(0.0, min(100.0, (totald - idled) * 100.0 / totald))
+        path = _find_gpu_thermal_path()
+        if path is not None:
+            return _cached_read(path, _parse_milli, size=16)
+        return _cached_call("vcgencmd measure_temp", _vcgencmd_temp_c, ttl=GPU_TEMP_TTL_SEC)
     except Exception:
         return None
 
 
-def _read_ram_percent_used(config: Config) -> Optional[float]:
-    """Return RAM used percent by parsing /proc/meminfo, or None if unavailable."""
-    if config["DEVELOPMENT_MODE"]:
-        return round(_randf(20.0, 85.0), 1)
+def _parse_cpu_stat(state: AppState, data: bytes) -> Optional[float]:
+    # Only runs when the cache refreshes, so the previous sample always spans >= one TTL window
+    m = _STAT_RE.match(data)
+    if m is None:
+        return None
+    user, nice, system, idle, iowait, irq, softirq, steal = (int(x or 0) for x in m.groups())
+    idle_all = idle + iowait
+    non_idle = user + nice + system + irq + softirq + steal
+    total = idle_all + non_idle
+    if state._prev_total is None:
+        state._prev_total, state._prev_idle = total, idle_all
+        return None
+    totald = total - state._prev_total
+    idled = idle_all - state._prev_idle
+    state._prev_total, state._prev_idle = total, idle_all
+    if totald <= 0:
+        return None
+    return max(0.0, min(100.0, (totald - idled) * 100.0 / totald))
+
+
+def _cpu_util_hw(state: AppState) -> Optional[float]:
     try:
-        meminfo = {}
-        with open("/proc/meminfo") as f:
-            for line in f:
-                k, v = line.split(":")
-                meminfo[k] = float(v.strip().split()[0])  # kB
-        total = meminfo.get("MemTotal")
-        avail = meminfo.get("MemAvailable")
-        if not total or not avail:
-            return None
-        used = total - avail
-        return used * 100.0 / total
+        return _cached_call("/proc/stat", lambda: _parse_cpu_stat(state, _pread("/proc/stat", 512)))
     except Exception:
         return None
 
 
-def _read_disk_free_percent(config: Config) -> Optional[float]:
-    """Return free disk percent for filesystem containing 'path', or None."""
-    if config["DEVELOPMENT_MODE"]:
-        return round(_randf(35.0, 95.0), 1)
+def _parse_meminfo(data: bytes) -> Optional[float]:
+    # Only MemTotal / MemAvailable are needed; both sit at the top of the file, in that order
+    m = _MEM_RE.match(data)
+    if m is None:
+        return None
+    total, avail = int(m.group(1)), int(m.group(2))  # kB
+    if not total or not avail:
+        return None
+    used = total - avail
+    return used * 100.0 / total
+
+
+def _ram_hw() -> Optional[float]:
     try:
-        st = os.statvfs(os.getcwd())
-        total = st.f_blocks * st.f_frsize
-        free = st.f_bavail * st.f_frsize
-        if total <= 0:
+        return _cached_read("/proc/meminfo", _parse_meminfo)
+    except Exception:
+        return None
+
+
+def _statvfs_free_percent(path: str) -> Optional[float]:
+    # fstatvfs on a held directory fd: no path walk per refresh
+    st = os.fstatvfs(_get_fd(path, _DIR_FLAGS)) if hasattr(os, "fstatvfs") else os.statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    if total <= 0:
+        return None
+    return free * 100.0 / total
+
+
+def _disk_free_hw(path: str) -> Optional[float]:
+    # Keyed per path: switching the save dir starts a fresh entry instead of serving the old volume
+    try:
+        return _cached_call(f"statvfs:{path}", lambda: _statvfs_free_percent(path), ttl=STATVFS_TTL_SEC)
+    except Exception:
+        return None
+
+
+def _forget_disk_free(path: str) -> None:
+    """Drop the cached disk-free value for path (call after freeing space)."""
+    _proc_cache.entries.pop(f"statvfs:{path}", None)
+
+
+def _parse_khz(data: bytes) -> float:
+    # scaling_cur_freq is always an integer kHz; int() tolerates the trailing newline
+    return int(data) / 1000.0
+
+
+def _find_cpufreq_path() -> Optional[str]:
+    """Probe once for the readable cpufreq node (layout differs by kernel); cached, may be None."""
+    def probe():
+        for p in (
+            "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq",
+            "/sys/devices/system/cpu/cpufreq/policy0/scaling_cur_freq",
+        ):
+            try:
+                _get_fd(p)
+                return p
+            except OSError:
+                continue
+        return None
+    return _cached_call("cpufreq_path", probe, ttl=float("inf"))
+
+
+def _cpu_freq_hw() -> Optional[float]:
+    try:
+        path = _find_cpufreq_path()
+        if path is None:
             return None
-        return free * 100.0 / total
+        return _cached_read(path, _parse_khz, size=32)
     except Exception:
         return None
 
 
+def _read_ina219(ina219) -> Tuple[float, float, float]:
+    power = ina219.get_power()
+    voltage = ina219.get_voltage()
+    current = ina219.get_current()
+    return current, voltage, power
+
+
+def _power_hw(config: Config) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    # Three I2C transactions per read; share one read per window like the procfs values
+    try:
+        ina219 = config["INA"]
+        return _cached_call("ina219", lambda: _read_ina219(ina219))
+    except Exception:
+        return None, None, None
+
+
+class MetricReaders(NamedTuple):
+    cpu_temp_c: Callable[[], Optional[float]]
+    gpu_temp_c: Callable[[], Optional[float]]
+    cpu_util_percent: Callable[[AppState], Optional[float]]
+    ram_percent_used: Callable[[], Optional[float]]
+    disk_free_percent: Callable[[str], Optional[float]]
+    cpu_freq_mhz: Callable[[], Optional[float]]
+    voltage_current: Callable[[Config], Tuple[Optional[float], Optional[float], Optional[float]]]
+
+
+_DEV_READERS = MetricReaders(_cpu_temp_dev, _gpu_temp_dev, _cpu_util_dev, _ram_dev,
+                             _disk_free_dev, _cpu_freq_dev, _power_dev)
+_HW_READERS = MetricReaders(_cpu_temp_hw, _gpu_temp_hw, _cpu_util_hw, _ram_hw,
+                            _disk_free_hw, _cpu_freq_hw, _power_hw)
+
+
+def _metric_readers(config: Config) -> MetricReaders:
+    """Reader set specialized for the mode, so hot paths skip the per-metric DEVELOPMENT_MODE branch."""
+    return _DEV_READERS if config["DEVELOPMENT_MODE"] else _HW_READERS
+
+
+def _read_cpu_temp_c(config: Config) -> Optional[float]:
+    """Return CPU temperature in °C, or None if unavailable (DEV may simulate)."""
+    return _metric_readers(config).cpu_temp_c()
+
+
+def _read_gpu_temp_c(config: Config) -> Optional[float]:
+    """Return GPU temperature in °C from the sysfs GPU zone, else vcgencmd (rate-limited), or None."""
+    return _metric_readers(config).gpu_temp_c()
+
+
+def _read_cpu_util_percent(config: Config, state:AppState) -> Optional[float]:
+    """
+    Return CPU utilization percent based on /proc/stat deltas, or None on first call.
+    DEV mode returns simulated values.
+    """
+    return _metric_readers(config).cpu_util_percent(state)
+
+
+def _read_ram_percent_used(config: Config) -> Optional[float]:
+    """Return RAM used percent by parsing /proc/meminfo, or None if unavailable."""
+    return _metric_readers(config).ram_percent_used()
+
+
+def _read_disk_free_percent(config: Config, path: str) -> Optional[float]:
+    """Return free disk percent for filesystem containing 'path', or None."""
+    return _metric_readers(config).disk_free_percent(path)
+
+
 def _read_cpu_freq_mhz(config: Config) -> Optional[float]:
     """Return current CPU frequency in MHz, or None if unavailable."""
-    if config["DEVELOPMENT_MODE"]:
-        return round(_randf(600.0, 1500.0), 0)
-    for p in (
-        "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq",
-        "/sys/devices/system/cpu/cpufreq/policy0/scaling_cur_freq",
-    ):
-        try:
-            with open(p) as f:
-                v = f.read().strip()
-                return (int(v) if v.isdigit() else float(v)) / 1000.0
-        except Exception:
-            continue
-    return None
+    return _metric_readers(config).cpu_freq_mhz()
 
 
 def _set_led(config: Config, state: AppState, on: bool) -> None:
@@ -146,39 +401,69 @@ def _set_led(config: Config, state: AppState, on: bool) -> None:
 
 
 def _read_voltage_current(config: Config) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-    """Return (current_A, voltage_V) from a sensor if present; DEV simulates."""
-    if config["DEVELOPMENT_MODE"]:
-        volts = round(_randf(4.80, 5.20), 3)
-        amps = round(_randf(0.10, 2.50), 3)
-        return amps, volts, volts * amps
-    try:
-        ina219 = config["INA"]
-        power = ina219.get_power()
-        voltage = ina219.get_voltage()
-        current = ina219.get_current()
-        return current, voltage, power
-    except Exception:
-        return None, None, None
+    """Return (current_A, voltage_V, power_W) from a sensor if present; DEV simulates."""
+    return _metric_readers(config).voltage_current(config)
+
+
+class _MJPEGSink(io.BufferedIOBase):
+    """
+    FileOutput target for the preview MJPEGEncoder: every write() is one complete JPEG.
+    Only the newest frame is kept; readers block until a frame newer than the one they have arrives.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame: Optional[bytes] = None
+        self._seq = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, buf) -> int:
+        frame = bytes(buf)
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+        return len(frame)
+
+    def next_frame(self, seq: int, timeout: float) -> Tuple[int, Optional[bytes]]:
+        """Return (seq, jpeg) of the first frame after `seq`, or (seq, None) on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != seq, timeout):
+                return seq, None
+            return self._seq, self._frame
+
+
+def _release_picam2(state: AppState) -> None:
+    """Stop (encoder included) and close the preview camera, if any. Caller holds _picam_lock or owns the camera."""
+    cam, state._picam2, state._preview_sink = state._picam2, None, None
+    if cam is None:
+        return
+    try: cam.stop_recording()
+    except Exception: pass
+    try: cam.close()
+    except Exception: pass
 
 
 def _ensure_picam2(state: AppState):
     """
-    (Re)create a lightweight Picamera2 instance configured for preview streaming.
+    (Re)create a lightweight Picamera2 instance streaming preview JPEGs.
+
+    Frames go through the ISP's hardware MJPEG encoder into `state._preview_sink`; no per-frame
+    Python/OpenCV encode.
 
     Returns:
-        A started Picamera2 instance using BGR888 for OpenCV-friendly JPEG encoding.
+        The _MJPEGSink the new camera writes to.
     """
     with state._picam_lock:
         # Always reset to avoid conflicts with recording instance
-        if state._picam2 is not None:
-            try: state._picam2.stop()
-            except Exception: pass
-            try: state._picam2.close()
-            except Exception: pass
-            _picam2 = None
+        _release_picam2(state)
 
         if Picamera2 is None:
             raise Exception("Picamera2 is None")
+        if MJPEGEncoder is None:
+            raise Exception("picamera2 MJPEGEncoder is not available")
 
         picam2 = Picamera2()
         width = int(state.CURRENT_VIDEO_RES[0])
@@ -187,14 +472,16 @@ def _ensure_picam2(state: AppState):
         # Start with current preview controls (skip Nones for manual fields)
         ctrl_init = _filter_controls(state._preview_ctrls)
 
-        config = picam2.create_preview_configuration(
-            main={"size": (width, height), "format": "RGB888"},
+        # YUV420 is the encoder's native input: no RGB conversion before the JPEG block
+        config = picam2.create_video_configuration(
+            main={"size": (width, height), "format": "YUV420"},
             controls={
                 "FrameRate": int(state.CURRENT_VIDEO_FPS)
             }
         )
         picam2.configure(config)
-        picam2.start()
+        sink = _MJPEGSink()
+        picam2.start_recording(MJPEGEncoder(), FileOutput(sink))
 
         # Apply again post-start (some controls behave better this way)
         try:
@@ -203,4 +490,5 @@ def _ensure_picam2(state: AppState):
             pass
 
         state._picam2 = picam2
-        return state._picam2
\ No newline at end of file
+        state._preview_sink = sink
+        return sink
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (C float/str serialization) when installed.
+    Falls back to the stdlib-based DefaultJSONProvider otherwise, or when
+    json.dumps-specific kwargs are passed.
+    """
+    if orjson is not None:
+        # datetimes go through Flask's default() so they keep the HTTP date format
+        _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # bytes straight into the response body: no str round-trip
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=self._OPTIONS),
+                                        mimetype=self.mimetype)
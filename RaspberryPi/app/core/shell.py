@@ -0,0 +1,131 @@
+import os
+import shlex
+import signal
+import selectors
+import subprocess
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+
+class ShellWorker:
+    """
+    One long-lived `bash --login -s` fed commands over stdin, so each /shell call skips the
+    fork+exec+profile startup of `bash -lc`.
+
+    Each command runs as `( eval <cmd> ) </dev/null` in a subshell: `cd`/variables don't leak
+    between calls and the command can't read the protocol stream. Completion is detected by a
+    per-call sentinel printed to stdout (with the exit code) and stderr.
+
+    Output is read as it is produced and capped at `max_bytes` per stream: a runaway command
+    (`yes`) is killed as soon as it overflows instead of filling RAM until the timeout.
+    """
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()  # one command at a time; callers fall back to a one-off bash if busy
+
+    def _spawn(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            # Own session so a timeout can kill the worker together with whatever it started
+            self._proc = subprocess.Popen(
+                ["bash", "--login", "-s"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, start_new_session=True
+            )
+            # Swallow whatever the login profile prints so it doesn't land in the first command's output
+            self._exchange(":", 10, 1 << 20)
+        return self._proc
+
+    def kill(self) -> None:
+        """Kill the worker and its children; the next run() spawns a fresh one."""
+        p, self._proc = self._proc, None
+        if p is None:
+            return
+        try:
+            os.killpg(p.pid, signal.SIGKILL)
+        except Exception:
+            p.kill()
+        p.wait()
+        for f in (p.stdin, p.stdout, p.stderr):
+            f.close()
+
+    def _exchange(self, cmd: str, timeout: float, max_bytes: int) -> Tuple[subprocess.CompletedProcess, bool]:
+        p = self._proc
+        tok = f"__END_{uuid.uuid4().hex}__".encode()
+        p.stdin.write((f"( eval {shlex.quote(cmd)} ) </dev/null; "
+                       f"printf '\\n%s%d\\n' {tok.decode()} $?; printf '\\n%s\\n' {tok.decode()} >&2\n").encode())
+        p.stdin.flush()
+
+        bufs = [bytearray(), bytearray()]
+        slack = max_bytes + len(tok) + 32  # room for the sentinel line behind a full buffer
+        truncated = False
+        sel = selectors.DefaultSelector()
+        sel.register(p.stdout, selectors.EVENT_READ, 0)
+        sel.register(p.stderr, selectors.EVENT_READ, 1)
+        deadline = time.monotonic() + timeout
+        try:
+            while sel.get_map() and not truncated:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.kill()
+                    raise subprocess.TimeoutExpired(cmd, timeout, output=_decode(bufs[0]), stderr=_decode(bufs[1]))
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        # Worker exited mid-command: report what we have
+                        sel.unregister(key.fileobj)
+                        continue
+                    buf = bufs[key.data]
+                    buf += chunk
+                    j = buf.find(tok)
+                    if j >= 0 and buf.find(b"\n", j + len(tok)) >= 0:
+                        sel.unregister(key.fileobj)
+                    elif j < 0 and len(buf) > slack:
+                        # Overflow: keep the head, stop the command now
+                        del buf[max_bytes:]
+                        truncated = True
+                        self.kill()
+                        break
+        finally:
+            sel.close()
+
+        # Cut at the sentinel, dropping the newline its printf puts in front of the marker
+        out, err = bufs
+        code = None
+        j = out.find(tok)
+        if j >= 0:
+            code = int(out[j + len(tok):out.index(b"\n", j + len(tok))])
+            out = out[:j - 1]
+        elif not truncated:
+            self.kill()
+        j = err.find(tok)
+        if j >= 0:
+            err = err[:j - 1]
+        truncated = truncated or len(out) > max_bytes or len(err) > max_bytes
+        res = subprocess.CompletedProcess(["bash", "-lc", cmd], code, _decode(out[:max_bytes]), _decode(err[:max_bytes]))
+        return res, truncated
+
+    def run(self, cmd: str, timeout: float, max_bytes: int) -> Tuple[subprocess.CompletedProcess, bool]:
+        """
+        Run `cmd` in the worker; the caller must hold `self.lock`.
+
+        Returns:
+            (CompletedProcess with decoded stdout/stderr capped at max_bytes, truncated flag).
+            A truncated run was killed, so its returncode is None.
+
+        Raises:
+            subprocess.TimeoutExpired with the partial output (the worker is killed)
+        """
+        self._spawn()
+        try:
+            return self._exchange(cmd, timeout, max_bytes)
+        except BrokenPipeError:
+            # Worker died between calls; retry once on a fresh one
+            self.kill()
+            self._spawn()
+            return self._exchange(cmd, timeout, max_bytes)
+
+
+def _decode(b: bytes) -> str:
+    return bytes(b).decode("utf-8", errors="replace")
@@ -1,6 +1,7 @@
 import datetime as dt
 import os, threading
-from typing import Optional
+from collections import deque
+from typing import Optional, Tuple
 
 try:
     import RPi.GPIO as GPIO
@@ -20,6 +21,13 @@ class AppState:
         self._prev_total = None
         self._prev_idle = None
 
+        # Metrics history (filled by the background sampler)
+        self._metrics_history = deque(maxlen=config["METRICS_HISTORY_LEN"])
+        self._metrics_lock = threading.Lock()
+        self._metrics_cond = threading.Condition(self._metrics_lock)  # notified on every new sample (SSE)
+        self._sampler_thread: Optional[threading.Thread] = None
+        self._metrics_json: Optional[Tuple[float, bytes]] = None  # (ts, serialized latest sample) for /metrics
+
         # LED
         self.LED_ON = True
         self.LED_PIN = config["LED_GPIO_PIN"]
@@ -36,17 +44,21 @@ class AppState:
         # Camera
         self._picam2 = None
         self._picam_lock = threading.Lock()
-        self._preview_fps = 25
+        self._preview_sink = None  # _MJPEGSink fed by the preview camera's encoder
 
         # Preview controls
         self._preview_ctrls = dict(config["DEFAULT_PREVIEW_CTRLS"])
 
         # Capture video
-        self._state_lock = threading.Lock()
-        self._is_running: bool = False
+        self._capture_lock = threading.Lock()  # start/stop only; readers use the snapshot below
+        # (is_running, last_start_ts), replaced as a whole under _capture_lock so /status can read it unlocked
+        self._capture_status: Tuple[bool, Optional[int]] = (False, None)
         self._stop_evt = threading.Event()
         self._capture_thread: Optional[threading.Thread] = None
-        self._last_start_ts: Optional[int] = None
+
+        # Mutable config (save dir / resolutions / FPS / LED): POST /config holds this, nothing else does
+        self._config_lock = threading.Lock()
+        self._config_json: Optional[bytes] = None  # serialized GET /config; dropped by every POST /config
 
         # Resolutions
         self.CURRENT_IMAGE_RES = config["IMAGE_RES_DEFAULT"]
@@ -1,5 +1,6 @@
 from typing import Optional, Tuple, Union, List
 import os
+from datetime import datetime
 from .logger import _log
 
 
@@ -40,6 +41,19 @@ def _safe_under_base(base: str, rel: str) -> str:
     return target
 
 
+def _dated_output_path(output_dir: str, kind: str, ext: str) -> str:
+    """
+    Return <output_dir>/<kind>/<YYYY-MM-DD>/<HH-MM-SS><ext>, creating the folders as needed.
+
+    One clock read for both date and time (no midnight split) and one makedirs(exist_ok) instead of
+    exists+mkdir per level. Not memoized: the file browser can trash the day folder at any time.
+    """
+    now = datetime.now()
+    day_dir = os.path.join(output_dir, kind, now.strftime("%Y-%m-%d"))
+    os.makedirs(day_dir, exist_ok=True)
+    return os.path.join(day_dir, now.strftime("%H-%M-%S") + ext)
+
+
 def _filter_controls(controls: dict):
     output_controls = {}
     for key in controls:
@@ -1,22 +1,11 @@
-import os
 import time
-from datetime import datetime
 from picamera2 import Picamera2
 from typing import Union
-from ..core.utils import _filter_controls
+from ..core.utils import _dated_output_path, _filter_controls
 
 
 def get_path(output_dir):
-    images_path = os.path.join(output_dir, "images")
-    if not os.path.exists(images_path):
-        os.mkdir(images_path)
-    current_date_str = datetime.now().strftime("%Y-%m-%d")
-    current_date_image_path = os.path.join(images_path, current_date_str)
-    if not os.path.exists(current_date_image_path):
-        os.mkdir(current_date_image_path)
-    current_time = datetime.now().strftime("%H-%M-%S")
-    output_path = os.path.join(current_date_image_path, f"{current_time}.jpg")
-    return output_path
+    return _dated_output_path(output_dir, "images", ".jpg")
 
 
 def image_capture(
@@ -1,14 +1,11 @@
 from picamera2 import Picamera2
 from picamera2.outputs import FfmpegOutput
 from picamera2.encoders import H264Encoder
-import cv2, psutil, threading, queue, os
-from datetime import datetime
+import psutil, threading
 from typing import Union
-from ..core.utils import _filter_controls
+from ..core.utils import _dated_output_path, _filter_controls
 
 
-frame_queue = queue.Queue(maxsize=500)
-
 def get_available_RAM():
     mem = psutil.virtual_memory()
     total = mem.total / 1e6
@@ -16,39 +13,8 @@ def get_available_RAM():
     return available, total
 
 
-def writer(output_dir, output_size, fps):
-    videos_path = os.path.join(output_dir, "videos")
-    if not os.path.exists(videos_path):
-        os.mkdir(videos_path)
-    current_date_str = datetime.now().strftime("%Y-%m-%d")
-    current_date_video_path = os.path.join(videos_path, current_date_str)
-    if not os.path.exists(current_date_video_path):
-        os.mkdir(current_date_video_path)
-    current_time = datetime.now().strftime("%H-%M-%S")
-    output_path = os.path.join(current_date_video_path, f"{current_time}.mp4")
-
-    fourcc = cv2.VideoWriter_fourcc(*'H264')
-    out = cv2.VideoWriter(output_path, fourcc, fps, output_size)
-    
-    while True:
-        frame = frame_queue.get()
-        if frame is None:
-            break
-        out.write(frame)
-    
-    out.release()
-
 def get_path(output_dir: str)-> str:
-    videos_path = os.path.join(output_dir, "videos")
-    if not os.path.exists(videos_path):
-        os.mkdir(videos_path)
-    current_date_str = datetime.now().strftime("%Y-%m-%d")
-    current_date_video_path = os.path.join(videos_path, current_date_str)
-    if not os.path.exists(current_date_video_path):
-        os.mkdir(current_date_video_path)
-    current_time = datetime.now().strftime("%H-%M-%S")
-    output_path = os.path.join(current_date_video_path, f"{current_time}.mp4")
-    return output_path
+    return _dated_output_path(output_dir, "videos", ".mp4")
 
 def video_capture(
         output_dir: str,
@@ -67,10 +33,12 @@ def video_capture(
     except Exception:
         pass
     
-    config = picam2.create_preview_configuration(
+    # Video configuration: more buffers than preview, so the VPU encoder never stalls the sensor
+    config = picam2.create_video_configuration(
         main={
             "size": (width, height),
-            "format": "RGB888"
+            # The encoder's native input: the ISP writes YUV420 directly, no RGB->YUV pass before encoding
+            "format": "YUV420"
         },
         controls={
             "FrameRate": fps
@@ -87,8 +55,8 @@ def video_capture(
     try:
         picam2.start_recording(encoder, output)
 
-        while not stop_evt.wait(timeout=0.25):
-            pass
+        # Sensor clock (FrameRate) paces the encoder; this thread just sleeps until /stop
+        stop_evt.wait()
 
     finally:
         try:
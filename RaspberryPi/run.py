@@ -1,8 +1,18 @@
+from werkzeug.serving import WSGIRequestHandler
 from app import create_app
 
 
 app = create_app()
 
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    """No per-request access line: the UI polls /status and holds /metrics/stream open constantly. Errors still log."""
+
+    def log_request(self, code="-", size="-"):
+        pass
+
+
 if __name__ == "__main__":
     # debug=True for live reload in dev; turn off on Pi
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    # threaded: one thread per request, so long-lived /metrics/stream and a slow /shell never starve other routes
+    app.run(host="0.0.0.0", port=8000, debug=True, threaded=True, request_handler=_QuietRequestHandler)
@@ -3,10 +3,11 @@
 // ======================================================
 
 // ----------------------- Globals -----------------------
-const POLL_EVERY_MS = 2000;
 let WINDOW_SEC = 30;                 // metrics window
 const WINDOW_MS = () => WINDOW_SEC * 1000;
 const MAX_POINTS = 5000;               // charts safety cap
+// Shared by every JSON POST (fetch copies it, never mutates it)
+const JSON_HEADERS = Object.freeze({ 'Content-Type': 'application/json' });
 
 // ----------------------- Utils -------------------------
 async function api(path, opts = {}) {
@@ -14,6 +15,10 @@ async function api(path, opts = {}) {
   const txt = await r.text();
   try { return JSON.parse(txt) } catch { return { text: txt, status: r.status } }
 }
+// DOM handles looked up once; the dashboard markup is static
+const _els = {};
+function byId(id) { return _els[id] ?? (_els[id] = document.getElementById(id)); }
+
 function setDonut(el, pctFree) {
   const clamped = Math.max(0, Math.min(100, pctFree || 0));
   el.setAttribute("stroke-dasharray", `${clamped} ${100 - clamped}`);
@@ -157,7 +162,21 @@ const PanelController = (() => {
     }
   }
 
-  return { register, closeAll };
+  // Outside-click dismissal: one document listener for every popover, touching only the open ones
+  const outside = [];  // [{ el, toggle, isOpen, close, keep }]
+  function dismissOnOutsideClick(p) {
+    if (p && p.el) outside.push(p);
+  }
+  document.addEventListener('click', (e) => {
+    const t = e.target;
+    for (const p of outside) {
+      if (!p.isOpen() || p.el.contains(t) || (p.toggle && p.toggle.contains(t))) continue;
+      if (p.keep && p.keep(t)) continue;
+      p.close();
+    }
+  });
+
+  return { register, closeAll, dismissOnOutsideClick };
 })();
 
 
@@ -177,14 +196,14 @@ function _fmtDur(sec) {
 }
 
 function _updateRecUI() {
-  const el = document.getElementById('status');
+  const el = byId('status');
   if (!el || !_recStart) return;
   const diff = Math.floor((Date.now() / 1000) - _recStart);
   el.innerHTML = '🟢 Recording <span class="mono">(' + _fmtDur(diff) + ')</span>';
 }
 
 function setStatus(running, sinceTs) {
-  const el = document.getElementById('status');
+  const el = byId('status');
   const cls = running ? 'ok' : 'warn';
   el.className = 'status ' + cls;
 
@@ -208,14 +227,17 @@ function setStatus(running, sinceTs) {
   }
 }
 
-async function refreshStatus() {
-  const s = await api('/status');
+function applyStatus(s) {
   setStatus(s.running, s.started_ts);
   // document.getElementById('save_dir') removed from DOM
-  const dp = document.getElementById('disk_path');
+  const dp = byId('disk_path');
   if (dp) dp.textContent = s.save_dir ?? '—';
 }
 
+async function refreshStatus() {
+  applyStatus(await api('/status'));
+}
+
 async function startCapture() {
   await api('/start');
   refreshStatus();
@@ -259,37 +281,85 @@ async function captureStill() {
 }
 
 // -------- Charts buffers --------
-const buf = { cur: [], vol: [], pow: [], cpu: [], ram: [], mhz: [] };
+// Fixed-capacity rings, oldest sample at `head`: push/prune are O(1) per sample (no Array.shift())
+function makeRing(cap) {
+  return { ts: new Float64Array(cap), v: new Float64Array(cap), head: 0, size: 0, cap };
+}
+const buf = {
+  cur: makeRing(MAX_POINTS), vol: makeRing(MAX_POINTS), pow: makeRing(MAX_POINTS),
+  cpu: makeRing(MAX_POINTS), ram: makeRing(MAX_POINTS), mhz: makeRing(MAX_POINTS),
+};
 
-function prune(a) {
+function prune(r) {
   const cutoff = performance.now() - WINDOW_MS();
-  while (a.length && a[0][0] < cutoff) a.shift();
-  while (a.length > MAX_POINTS) a.shift();
+  while (r.size && r.ts[r.head] < cutoff) { r.head = (r.head + 1) % r.cap; r.size--; }
 }
 function push(bufname, v, tMs) {
   if (v == null) return;
-  const a = buf[bufname];
-  a.push([tMs, v]);
-  prune(a);
+  const r = buf[bufname];
+  if (r.size === r.cap) { r.head = (r.head + 1) % r.cap; r.size--; }  // full: drop the oldest
+  const i = (r.head + r.size) % r.cap;
+  r.ts[i] = tMs; r.v[i] = v; r.size++;
+  prune(r);
+}
+
+// Min/max per bucket (kept in time order) so spikes survive; one bucket per ~2 device px
+function downsample(r, buckets) {
+  const out = makeRing(2 * buckets);
+  const per = r.size / buckets;
+  const emit = j => { out.ts[out.size] = r.ts[j]; out.v[out.size] = r.v[j]; out.size++; };
+  for (let b = 0; b < buckets; b++) {
+    const k0 = Math.floor(b * per), k1 = Math.min(r.size, Math.floor((b + 1) * per));
+    if (k0 >= k1) continue;
+    let jMin = (r.head + k0) % r.cap, jMax = jMin, kMin = k0, kMax = k0;
+    for (let k = k0 + 1; k < k1; k++) {
+      const j = (r.head + k) % r.cap;
+      if (r.v[j] < r.v[jMin]) { jMin = j; kMin = k; }
+      if (r.v[j] > r.v[jMax]) { jMax = j; kMax = k; }
+    }
+    if (kMin === kMax) emit(jMin);
+    else if (kMin < kMax) { emit(jMin); emit(jMax); }
+    else { emit(jMax); emit(jMin); }
+  }
+  return out;
 }
 
+// canvas -> { key, pts }: chip toggles / theme redraws reuse the last fold of an unchanged series
+const sparkCache = new WeakMap();
+
 function drawSparkline(canvas, series, { min = null, max = null } = {}) {
   const ctx = canvas.getContext('2d');
   const w = canvas.width = canvas.clientWidth * devicePixelRatio;
   const h = canvas.height = canvas.clientHeight * devicePixelRatio;
   ctx.clearRect(0, 0, w, h);
-  if (!series.length) return;
+  if (!series.size) return;
+
+  const buckets = Math.max(1, Math.floor(w / (2 * devicePixelRatio)));
+  if (series.size > 2 * buckets) {
+    const last = series.ts[(series.head + series.size - 1) % series.cap];
+    const key = `${buckets}:${series.size}:${series.ts[series.head]}:${last}`;
+    const hit = sparkCache.get(canvas);
+    if (hit && hit.key === key) series = hit.pts;
+    else { series = downsample(series, buckets); sparkCache.set(canvas, { key, pts: series }); }
+  }
+  const { ts: T, v: V, head, size: n, cap } = series;
 
   const now = performance.now();
   const dtWindow = WINDOW_MS();
-  const t0 = Math.min(series[0][0], now - dtWindow);
-  const t1 = Math.max(series[series.length - 1][0], now);
+  const t0 = Math.min(T[head], now - dtWindow);
+  const t1 = Math.max(T[(head + n - 1) % cap], now);
   const dt = Math.max(1, t1 - t0);
 
-  const values = series.map(p => p[1]).filter(v => v != null && isFinite(v));
-  if (!values.length) return;
-  let lo = (min ?? Math.min(...values));
-  let hi = (max ?? Math.max(...values));
+  let vMin = Infinity, vMax = -Infinity;
+  for (let k = 0; k < n; k++) {
+    const v = V[(head + k) % cap];
+    if (!isFinite(v)) continue;
+    if (v < vMin) vMin = v;
+    if (v > vMax) vMax = v;
+  }
+  if (vMin === Infinity) return;
+  let lo = (min ?? vMin);
+  let hi = (max ?? vMax);
   if (!isFinite(lo) || !isFinite(hi) || hi === lo) { lo = lo || 0; hi = lo + 1; }
 
   const pad = 6 * devicePixelRatio;
@@ -309,55 +379,79 @@ function drawSparkline(canvas, series, { min = null, max = null } = {}) {
   // line
   ctx.lineWidth = 2 * devicePixelRatio;
   ctx.strokeStyle = "#7dd3fc";
-  ctx.beginPath();
-  for (let i = 0; i < series.length; i++) {
-    const [t, v] = series[i];
-    const x = pad + ((t - t0) / dt) * (w - 2 * pad);
-    const y = h - pad - ((v - lo) / (hi - lo)) * (h - 2 * pad);
-    if (i === 0) ctx.moveTo(x, y); else ctx.lineTo(x, y);
+  // One Path2D per chart; interior points of flat runs add nothing to a straight segment, skip them
+  const path = new Path2D();
+  for (let k = 0; k < n; k++) {
+    const j = (head + k) % cap;
+    if (k > 0 && k < n - 1 && V[j] === V[(j + cap - 1) % cap] && V[j] === V[(j + 1) % cap]) continue;
+    const x = pad + ((T[j] - t0) / dt) * (w - 2 * pad);
+    const y = h - pad - ((V[j] - lo) / (hi - lo)) * (h - 2 * pad);
+    if (k === 0) path.moveTo(x, y); else path.lineTo(x, y);
   }
-  ctx.stroke();
+  ctx.stroke(path);
 }
 
 function redrawAllSparklines() {
-  drawSparkline(document.getElementById('cur'), buf.cur, { min: 0 });
-  drawSparkline(document.getElementById('vol'), buf.vol);
-  drawSparkline(document.getElementById('pow'), buf.vol);
-  drawSparkline(document.getElementById('cpu'), buf.cpu, { min: 0, max: 100 });
-  drawSparkline(document.getElementById('ram'), buf.ram, { min: 0, max: 100 });
-  drawSparkline(document.getElementById('mhz'), buf.mhz);
+  drawSparkline(byId('cur'), buf.cur, { min: 0 });
+  drawSparkline(byId('vol'), buf.vol);
+  drawSparkline(byId('pow'), buf.pow);
+  drawSparkline(byId('cpu'), buf.cpu, { min: 0, max: 100 });
+  drawSparkline(byId('ram'), buf.ram, { min: 0, max: 100 });
+  drawSparkline(byId('mhz'), buf.mhz);
+}
+
+function startMetricsStream() {
+  // One long-lived connection; the server pushes each sample (and capture status) and replays history on (re)connect
+  // via Last-Event-ID, so the browser's own retry logic covers dropped links.
+  // A replayed backlog arrives as a burst of events: queue them and redraw once per frame.
+  // Hidden tab: close the stream (no server pushes, no parsing); on return resume from the last ts.
+  let es = null, lastTs = 0, pending = [];
+  function open() {
+    es = new EventSource(`/metrics/stream?since=${lastTs}`);
+    es.onmessage = e => {
+      const m = JSON.parse(e.data);
+      lastTs = m.ts;
+      if (!pending.length) requestAnimationFrame(() => { const s = pending; pending = []; applySamples(s); });
+      pending.push(m);
+    };
+    // Capture state arrives on the same connection: on connect and on every change
+    es.addEventListener('status', e => applyStatus(JSON.parse(e.data)));
+  }
+  document.addEventListener('visibilitychange', () => {
+    if (document.hidden) { es?.close(); es = null; }
+    else if (!es) open();
+  });
+  if (!document.hidden) open();
 }
 
 
-async function tick() {
-  const m = await api('/metrics');
-  const now = performance.now();
+function applySamples(samples) {
+  if (!samples.length) return;
+
+  for (const s of samples) {
+    const t = s.ts * 1000 - performance.timeOrigin;   // server epoch -> performance.now() timebase
+    push('cur', s.sensors.current_a, t);
+    push('vol', s.sensors.voltage_v, t);
+    push('pow', s.sensors.power_w, t);
+    push('cpu', s.cpu.util_pct, t);
+    push('ram', s.ram.used_pct, t);
+    push('mhz', s.cpu.freq_mhz, t);
+  }
+  const m = samples[samples.length - 1];
 
-  document.getElementById('cpu_temp').innerHTML = (m.cpu.temp_c ?? '—') + '<span class="unit">°C</span>';
-  document.getElementById('gpu_temp').innerHTML = (m.gpu.temp_c ?? '—') + '<span class="unit">°C</span>';
-  document.getElementById('disk_free').innerHTML = (m.disk.free_pct ?? '—') + '<span class="unit">%</span>';
-  setDonut(document.getElementById('donut'), m.disk.free_pct ?? 0);
-
-  push('cur', m.sensors.current_a, now);
-  push('vol', m.sensors.voltage_v, now);
-  push('pow', m.sensors.power_w, now);
-  push('cpu', m.cpu.util_pct, now);
-  push('ram', m.ram.used_pct, now);
-  push('mhz', m.cpu.freq_mhz, now);
-
-  document.getElementById('cur_now').textContent = m.sensors.current_a ?? '—';
-  document.getElementById('vol_now').textContent = m.sensors.voltage_v ?? '—';
-  document.getElementById('pow_now').textContent = m.sensors.power_w ?? '—';
-  document.getElementById('cpu_now').textContent = m.cpu.util_pct ?? '—';
-  document.getElementById('ram_now').textContent = m.ram.used_pct ?? '—';
-  document.getElementById('mhz_now').textContent = m.cpu.freq_mhz ?? '—';
-
-  drawSparkline(document.getElementById('cur'), buf.cur, { min: 0 });
-  drawSparkline(document.getElementById('vol'), buf.vol);
-  drawSparkline(document.getElementById('pow'), buf.pow);
-  drawSparkline(document.getElementById('cpu'), buf.cpu, { min: 0, max: 100 });
-  drawSparkline(document.getElementById('ram'), buf.ram, { min: 0, max: 100 });
-  drawSparkline(document.getElementById('mhz'), buf.mhz);
+  byId('cpu_temp').innerHTML = (m.cpu.temp_c ?? '—') + '<span class="unit">°C</span>';
+  byId('gpu_temp').innerHTML = (m.gpu.temp_c ?? '—') + '<span class="unit">°C</span>';
+  byId('disk_free').innerHTML = (m.disk.free_pct ?? '—') + '<span class="unit">%</span>';
+  setDonut(byId('donut'), m.disk.free_pct ?? 0);
+
+  byId('cur_now').textContent = m.sensors.current_a ?? '—';
+  byId('vol_now').textContent = m.sensors.voltage_v ?? '—';
+  byId('pow_now').textContent = m.sensors.power_w ?? '—';
+  byId('cpu_now').textContent = m.cpu.util_pct ?? '—';
+  byId('ram_now').textContent = m.ram.used_pct ?? '—';
+  byId('mhz_now').textContent = m.cpu.freq_mhz ?? '—';
+
+  redrawAllSparklines();
 }
 
 // -------- Window chip controls --------
@@ -369,19 +463,14 @@ function setupWindowChips() {
       c.classList.toggle('active', Number(c.dataset.win) === WINDOW_SEC);
     });
     Object.values(buf).forEach(prune);
-    drawSparkline(document.getElementById('cur'), buf.cur, { min: 0 });
-    drawSparkline(document.getElementById('vol'), buf.vol);
-    drawSparkline(document.getElementById('pow'), buf.pow);
-    drawSparkline(document.getElementById('cpu'), buf.cpu, { min: 0, max: 100 });
-    drawSparkline(document.getElementById('ram'), buf.ram, { min: 0, max: 100 });
-    drawSparkline(document.getElementById('mhz'), buf.mhz);
+    redrawAllSparklines();
   }
   allChips.forEach(chip => chip.addEventListener('click', () => activate(chip.dataset.win)));
   activate(document.querySelector('.chip.active')?.dataset.win ?? 30);
 }
 
 // ======================================================
-// SHELL Drawer (exclusive + 'cls' to clear)
+// SHELL Drawer (exclusive + 'cls'/'clear' to clear)
 // ======================================================
 (function () {
   const drawer = document.getElementById('shell-drawer');
@@ -410,31 +499,43 @@ function setupWindowChips() {
 
   PanelController.register({ shell: { close: closeDrawer } });
 
+  // Scrollback cap in text nodes (~4 per command); the oldest chunk goes once it is exceeded
+  const MAX_OUT_NODES = 2000, TRIM_OUT_NODES = 500;
+
+  // Append as a new text node: `textContent +=` would re-copy the whole scrollback every line
+  function write(text) {
+    output.insertAdjacentText('beforeend', text);
+    if (output.childNodes.length > MAX_OUT_NODES) {
+      for (let i = 0; i < TRIM_OUT_NODES; i++) output.removeChild(output.firstChild);
+    }
+    output.scrollTop = output.scrollHeight;
+  }
+
   function appendOut(kind, text) {
     const prefix = kind === 'stderr' ? '[stderr] ' : '';
-    output.textContent += (prefix + (text || '')).replace(/\r\n/g, '\n') + '\n';
-    output.scrollTop = output.scrollHeight;
+    write((prefix + (text || '')).replace(/\r\n/g, '\n') + '\n');
   }
 
+  function clearOutput() { output.textContent = ''; input.select(); }
+
+  // Commands handled in the browser, never sent to /shell (keyed by lowercased command)
+  const LOCAL = Object.freeze({ cls: clearOutput, clear: clearOutput });
+
   async function runCommand() {
     const cmd = (input.value || '').trim();
     const timeout = Math.max(1, Math.min(parseInt(tout.value || '15', 10), 300));
     if (!cmd) return;
 
-    // intercept 'cls'
-    if (cmd.toLowerCase() === 'cls') {
-      output.textContent = '';
-      input.select();
-      return;
-    }
+    const local = LOCAL[cmd.toLowerCase()];
+    if (local) { local(); return; }
 
     runBtn.disabled = true;
     status.textContent = 'Running…';
-    output.textContent += `$ ${cmd}\n`;
+    write(`$ ${cmd}\n`);
     try {
       const res = await fetch('/shell', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: JSON_HEADERS,
         body: JSON.stringify({ cmd, timeout })
       });
       if (!res.ok) {
@@ -444,7 +545,7 @@ function setupWindowChips() {
         if (data.stdout) appendOut('stdout', data.stdout);
         if (data.stderr) appendOut('stderr', data.stderr);
         if (!data.stdout && !data.stderr) appendOut('stdout', '[no output]');
-        output.textContent += `[exit=${data.code ?? '—'} ok=${data.ok} elapsed=${data.elapsed_sec ?? '—'}s${data.timeout ? ' TIMEOUT' : ''}]\n\n`;
+        write(`[exit=${data.code ?? '—'} ok=${data.ok} elapsed=${data.elapsed_sec ?? '—'}s${data.timeout ? ' TIMEOUT' : ''}]\n\n`);
       }
     } catch (e) {
       appendOut('stderr', String(e));
@@ -535,24 +636,43 @@ function setupWindowChips() {
       logHoursInput.value = 24;
       logHoursInput.dataset.default = 24;
     }
+
+    // Freshly loaded values are what the server has: no POST until something actually changes
+    lastSentConfig = configPayload();
   }
 
   // Debounced auto-apply for any input in this drawer
   let applyTimer = null;
+  let lastSentConfig = null;   // body of the last successful POST (or of the loaded config)
+  let inflightConfig = null;   // AbortController of the POST still in flight
+  function configPayload() {
+    return JSON.stringify({
+      save_dir: (saveDirInput.value || '').trim(),
+      image_res: (imgResInput.value || '').trim(),
+      video_res: (vidResInput.value || '').trim(),
+      video_fps: parseInt(vidFpsInput.value || '25', 10)
+    });
+  }
   function scheduleApplyConfig() {
     if (applyTimer) clearTimeout(applyTimer);
     applyTimer = setTimeout(async () => {
-      const payload = {
-        save_dir: (saveDirInput.value || '').trim(),
-        image_res: (imgResInput.value || '').trim(),
-        video_res: (vidResInput.value || '').trim(),
-        video_fps: parseInt(vidFpsInput.value || '25', 10)
-      };
-      await fetch('/config', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+      const body = configPayload();
+      if (body === lastSentConfig) return;   // typed back to what the server already has
+      inflightConfig?.abort();               // a newer edit supersedes the pending POST
+      const ctl = inflightConfig = new AbortController();
+      try {
+        await fetch('/config', {
+          method: 'POST',
+          headers: JSON_HEADERS,
+          body,
+          signal: ctl.signal
+        });
+      } catch (e) {
+        if (e.name === 'AbortError') return;
+        throw e;
+      }
+      if (inflightConfig === ctl) inflightConfig = null;
+      lastSentConfig = body;
       refreshStatus();
     }, 300);
   }
@@ -564,7 +684,7 @@ function setupWindowChips() {
       const hrs = Math.max(1, Math.min(parseInt(logHoursInput.value || '24', 10), 720));
       await fetch('/log/config', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: JSON_HEADERS,
         body: JSON.stringify({ reset_hours: hrs })
       });
     }, 300);
@@ -591,7 +711,7 @@ function setupWindowChips() {
   async function applyLed() {
     await fetch('/config', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: JSON_HEADERS,
       body: JSON.stringify({ led_on: !!ledToggle.checked })
     });
   }
@@ -648,6 +768,11 @@ function setupWindowChips() {
   const shutdownBtn = document.querySelector('#power-pop [data-action="shutdown"]');
 
   let pendingAction = null;
+  // The only two bodies /power accepts, stringified once
+  const POWER_BODIES = Object.freeze({
+    reboot: JSON.stringify({ action: 'reboot' }),
+    shutdown: JSON.stringify({ action: 'shutdown' })
+  });
 
   function isOpen() { return pop && pop.classList.contains('open'); }
   function openPop() {
@@ -692,8 +817,8 @@ function setupWindowChips() {
     try {
       const r = await fetch('/power', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ action })
+        headers: JSON_HEADERS,
+        body: POWER_BODIES[action] ?? JSON.stringify({ action })
       });
       const data = await r.json();
       if (!r.ok || !data.ok) {
@@ -719,10 +844,7 @@ function setupWindowChips() {
   }
 
   // Close popover when clicking outside it
-  document.addEventListener('click', (e) => {
-    if (!pop) return;
-    if (!pop.contains(e.target) && e.target !== btn) closePop();
-  });
+  PanelController.dismissOnOutsideClick({ el: pop, toggle: btn, isOpen, close: closePop });
 
   // === Attach click handlers to the popover buttons ===
   // 1) Robust event delegation (works even if you re-render buttons)
@@ -966,7 +1088,7 @@ function setupWindowChips() {
         try {
           await fetch('/preview_controls', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: JSON_HEADERS,
             body: JSON.stringify(partial)
           });
         } catch (e) { }
@@ -989,7 +1111,7 @@ function setupWindowChips() {
       try {
         await fetch('/preview_controls', {
           method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
+          headers: JSON_HEADERS,
           body: JSON.stringify({ reset: true })
         });
         await loadPreviewControls(); // refresh UI from server defaults
@@ -1097,10 +1219,7 @@ function setupWindowChips() {
     }
   });
 
-  document.addEventListener('click', (e) => {
-    if (!pop) return;
-    if (!pop.contains(e.target) && e.target !== btn) closePop();
-  });
+  PanelController.dismissOnOutsideClick({ el: pop, toggle: btn, isOpen, close: closePop });
 })();
 
 // ======================================================
@@ -1211,7 +1330,7 @@ function setupWindowChips() {
   async function deletePath(pathRel, permanent = false) {
     const res = await fetch('/delete', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: JSON_HEADERS,
       body: JSON.stringify({ path: pathRel, permanent })
     });
     const data = await res.json();
@@ -1401,11 +1520,10 @@ function setupWindowChips() {
     e.stopPropagation();
     togglePop();
   });
-  document.addEventListener('click', (e) => {
-    if (!pop) return;
+  PanelController.dismissOnOutsideClick({
+    el: pop, toggle: btn, isOpen, close: closePop,
     // Don't close if interacting with known modals (viewer, confirm)
-    if (e.target.closest('#viewer-modal') || e.target.closest('#confirm-modal')) return;
-    if (!pop.contains(e.target) && e.target !== btn) closePop();
+    keep: (t) => t.closest('#viewer-modal') || t.closest('#confirm-modal')
   });
 
   // Navigate by clicking rows (dirs navigate; files open viewer)
@@ -1594,10 +1712,7 @@ function openViewer(filePath, fileName) {
     e.stopPropagation();
     togglePop();
   });
-  document.addEventListener('click', (e) => {
-    if (!pop) return;
-    if (!pop.contains(e.target) && e.target !== btn) closePop();
-  });
+  PanelController.dismissOnOutsideClick({ el: pop, toggle: btn, isOpen, close: closePop });
   refreshBtn && refreshBtn.addEventListener('click', loadLog);
 })();
 
@@ -1669,7 +1784,7 @@ const NetworkController = (() => {
     try {
       const res = await fetch('/network/switch', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: JSON_HEADERS,
         body: JSON.stringify({ mode })
       });
       const d = await res.json();
@@ -1698,10 +1813,10 @@ const NetworkController = (() => {
     }
 
     // Close on outside click
-    document.addEventListener('click', (e) => {
-      if (pop && pop.classList.contains('show') && !pop.contains(e.target) && !btn.contains(e.target)) {
-        pop.classList.remove('show');
-      }
+    PanelController.dismissOnOutsideClick({
+      el: pop, toggle: btn,
+      isOpen: () => pop.classList.contains('show'),
+      close: () => pop.classList.remove('show')
     });
 
     if (swAp) swAp.addEventListener('click', () => doSwitch('ap'));
@@ -1714,11 +1829,9 @@ const NetworkController = (() => {
 
 async function boot() {
   NetworkController.init();
-  await refreshStatus();
-  setInterval(refreshStatus, 2000);
   setupWindowChips();
-  await tick();
-  setInterval(tick, POLL_EVERY_MS);
+  // Metrics and /status are both pushed on this stream; start/stop clicks still refresh status directly
+  startMetricsStream();
 }
 boot();
 